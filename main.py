@@ -1,10 +1,12 @@
-import time
+import os
 import cv2
 import numpy as np
 from stable_baselines3 import PPO
 from src.cv.cv_module import ComputerVision
 from src.cv.state_builder import StateBuilder
+from src.cv.calibration import TableCalibrator
 from src.integration.action_executor import ActionExecutor
+from src.integration.runtime import Pipeline
 
 def main():
     print("Initializing PokerVision3 Bot...")
@@ -23,34 +25,25 @@ def main():
         print("Model not found! Please run src/rl/train_agent.py first.")
         return
 
+    # 3. Auto-calibration (optional): regions follow the table window if a layout exists
+    calibrator = None
+    anchor_path, layout_path = "data/templates/anchor.png", "data/layouts/table.json"
+    if os.path.exists(anchor_path) and os.path.exists(layout_path):
+        calibrator = TableCalibrator(anchor_path, layout_path)
+        if not calibrator.ensure(cv, executor):
+            print("Table anchor not found, using default regions.")
+    
+    # 4. Pipelined runtime: capture -> detect -> decide -> act
+    # Stages overlap and stale frames are dropped instead of sleeping between ticks.
+    # If turn templates are available, full recognition only runs when it is our turn.
+    # For safety, act=False only prints the recommended action.
+    pipeline = Pipeline(cv, builder, model, executor=executor, act=False,
+                        turn_gate=cv.state_detector.can_detect_turn, calibrator=calibrator)
+    
     print("Bot is running. Press Ctrl+C to stop.")
     
     try:
-        while True:
-            # 3. Capture & Detect
-            raw_state = cv.get_state()
-            
-            # Check if it's my turn?
-            # CV should ideally tell us if "Hero" is active/turn.
-            # For now, we run continuously or wait for a specific trigger.
-            # Let's assume we act if we have cards and it looks like our turn (not implemented yet).
-            
-            # 4. Build Observation
-            obs = builder.build_observation(raw_state)
-            
-            # 5. Predict Action
-            action, _states = model.predict(obs, deterministic=True)
-            
-            # 6. Execute Action
-            # Only execute if we are confident it's our turn.
-            # For safety, we just print the recommendation for now.
-            print(f"Recommended Action: {action}")
-            
-            # executor.execute_action(int(action))
-            
-            # Sleep to avoid spamming
-            time.sleep(2.0)
-            
+        pipeline.run_forever()
     except KeyboardInterrupt:
         print("Bot stopped.")
 
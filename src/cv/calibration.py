@@ -0,0 +1,130 @@
+import json
+import os
+import cv2
+import numpy as np
+
+def layout_from_absolute(regions, buttons, anchor):
+    """
+    Builds a layout (regions and buttons relative to the anchor's top-left)
+    from absolute coordinates, e.g. the current hard-coded 1920x1080 ones.
+    """
+    ax, ay = anchor
+    
+    def rel(region):
+        return dict(region, left=region["left"] - ax, top=region["top"] - ay)
+        
+    layout_regions = {}
+    for name, value in regions.items():
+        layout_regions[name] = rel(value) if isinstance(value, dict) else [rel(r) for r in value]
+    layout_buttons = {str(k): [x - ax, y - ay] for k, (x, y) in buttons.items()}
+    return {"regions": layout_regions, "buttons": layout_buttons}
+
+class TableCalibrator:
+    """
+    Anchor-based calibration of table regions.
+    A one-time (expensive) template search finds an anchor element such as
+    the table logo; every region and button is then derived from a layout
+    file relative to that anchor. The anchor position is cached to disk,
+    and at runtime only a small window around it is checked; the full
+    search runs again only when the anchor has drifted out of that window.
+    """
+    def __init__(self, anchor_template, layout_path, cache_path="data/calibration.json",
+                 threshold=0.8, check_margin=16):
+        # anchor_template: path of the anchor PNG
+        # layout_path: JSON {"regions": {...}, "buttons": {...}} relative to the anchor
+        # check_margin: pixels around the cached anchor searched by the cheap check
+        self.anchor = cv2.imread(anchor_template, 0)
+        if self.anchor is None:
+            raise IOError(f"Cannot read anchor template {anchor_template}")
+        with open(layout_path) as f:
+            self.layout = json.load(f)
+        self.cache_path = cache_path
+        self.threshold = threshold
+        self.check_margin = check_margin
+        self.position = self._load_cache()
+        self.applied = None # Anchor position the regions were last derived from
+        self.searches = 0
+
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        with open(self.cache_path) as f:
+            return tuple(json.load(f)["anchor"])
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        directory = os.path.dirname(self.cache_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(self.cache_path, "w") as f:
+            json.dump({"anchor": list(self.position)}, f)
+
+    def _match(self, gray):
+        if gray.shape[0] < self.anchor.shape[0] or gray.shape[1] < self.anchor.shape[1]:
+            return 0.0, None
+        res = cv2.matchTemplate(gray, self.anchor, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(res)
+        return max_val, max_loc
+
+    def locate(self, screen):
+        """Full-screen anchor search (expensive). Returns (x, y) or None."""
+        self.searches += 1
+        gray = screen if screen.ndim == 2 else cv2.cvtColor(screen, cv2.COLOR_BGR2GRAY)
+        score, loc = self._match(gray)
+        if score < self.threshold:
+            return None
+        self.position = loc
+        self._save_cache()
+        return loc
+
+    def check(self, capture, monitor_number=1):
+        """
+        Cheap check: looks for the anchor only near its cached position.
+        Small drift inside the margin is followed. Returns True if the anchor is still there.
+        """
+        if self.position is None:
+            return False
+        x, y = self.position
+        h, w = self.anchor.shape[:2]
+        m = self.check_margin
+        left, top = max(0, x - m), max(0, y - m)
+        img = capture.capture_region({"top": top, "left": left, "width": w + 2 * m, "height": h + 2 * m},
+                                     monitor_number)
+        score, loc = self._match(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY))
+        if score < self.threshold:
+            return False
+        position = (left + loc[0], top + loc[1])
+        if position != self.position:
+            self.position = position
+            self._save_cache()
+        return True
+
+    def ensure(self, cv, executor=None):
+        """
+        Makes sure cv (and executor) use regions for the current anchor.
+        Runs the cheap check and falls back to a full search only on drift.
+        Returns True if the table was found.
+        """
+        if not self.check(cv.capture, cv.monitor_number):
+            if self.locate(cv.capture.capture_screen(cv.monitor_number)) is None:
+                return False
+        if self.position != self.applied:
+            self.apply(cv, executor)
+        return True
+
+    def apply(self, cv, executor=None):
+        """Writes absolute regions (and button positions) for the current anchor."""
+        ax, ay = self.position
+        
+        def absolute(region):
+            return dict(region, left=region["left"] + ax, top=region["top"] + ay)
+            
+        regions = {}
+        for name, value in self.layout["regions"].items():
+            regions[name] = absolute(value) if isinstance(value, dict) else [absolute(r) for r in value]
+        cv.regions = regions
+        self.applied = self.position
+        
+        if executor is not None and "buttons" in self.layout:
+            executor.buttons = {int(k): (x + ax, y + ay) for k, (x, y) in self.layout["buttons"].items()}
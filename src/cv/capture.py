@@ -1,28 +1,149 @@
-import mss
 import numpy as np
 import cv2
 import time
+from .capture_backends import MssBackend
+
+class RegionFrame:
+    """
+    A frame made of a few screen boxes instead of the full monitor.
+    All boxes live in one preallocated buffer that is refilled on every grab,
+    so crops handed to the detectors are views, not copies.
+    """
+    def __init__(self, boxes, channels=3):
+        # boxes: list of dicts with 'top', 'left', 'width', 'height' (monitor-relative)
+        # channels: 3 for BGR, 1 for single planes such as grayscale
+        self.boxes = boxes
+        self.channels = channels
+        total = sum(b["width"] * b["height"] * channels for b in boxes)
+        self.buffer = np.empty(total, dtype=np.uint8)
+
+        self.planes = []
+        offset = 0
+        for b in boxes:
+            size = b["width"] * b["height"] * channels
+            shape = (b["height"], b["width"], channels) if channels > 1 else (b["height"], b["width"])
+            plane = self.buffer[offset:offset + size].reshape(shape)
+            self.planes.append(plane)
+            offset += size
+
+    def crop(self, region):
+        """Returns a view of the region from the box that contains it, or None."""
+        t, l, w, h = region["top"], region["left"], region["width"], region["height"]
+        for box, plane in zip(self.boxes, self.planes):
+            bt, bl = box["top"], box["left"]
+            if (t >= bt and l >= bl and
+                    t + h <= bt + box["height"] and l + w <= bl + box["width"]):
+                return plane[t - bt:t - bt + h, l - bl:l - bl + w]
+        return None
+
+def plan_capture_boxes(regions, max_boxes=4):
+    """
+    Groups regions into at most `max_boxes` bounding boxes.
+    Overlapping boxes are always merged; after that the pair whose union
+    wastes the fewest extra pixels is merged until the limit is met.
+    """
+    def area(b):
+        return b[2] * b[3]
+
+    def union(a, b):
+        l, t = min(a[0], b[0]), min(a[1], b[1])
+        r, btm = max(a[0] + a[2], b[0] + b[2]), max(a[1] + a[3], b[1] + b[3])
+        return (l, t, r - l, btm - t)
+
+    def overlaps(a, b):
+        return (a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and
+                a[1] < b[1] + b[3] and b[1] < a[1] + a[3])
+
+    boxes = [(r["left"], r["top"], r["width"], r["height"]) for r in regions]
+
+    while len(boxes) > 1:
+        best = None
+        for i in range(len(boxes)):
+            for j in range(i + 1, len(boxes)):
+                a, b = boxes[i], boxes[j]
+                u = union(a, b)
+                waste = 0 if overlaps(a, b) else area(u) - area(a) - area(b)
+                if best is None or waste < best[0]:
+                    best = (waste, i, j, u)
+
+        waste, i, j, u = best
+        if waste > 0 and len(boxes) <= max_boxes:
+            break
+        boxes = [b for k, b in enumerate(boxes) if k not in (i, j)] + [u]
+
+    return [{"top": t, "left": l, "width": w, "height": h} for l, t, w, h in boxes]
 
 class ScreenCapture:
-    def __init__(self):
-        self.sct = mss.mss()
+    def __init__(self, backend=None):
+        # backend: a CaptureBackend (live mss by default, or a recorded-session replay)
+        self.backend = backend or MssBackend()
+
+    @property
+    def monitors(self):
+        return self.backend.monitors
+
+    def _to_bgr(self, img, dst=None):
+        """BGRA (live capture) or BGR (recordings) -> BGR, written into dst if given."""
+        if img.shape[2] == 4:
+            return cv2.cvtColor(img, cv2.COLOR_BGRA2BGR, dst=dst)
+        if dst is None:
+            return img.copy()
+        np.copyto(dst, img)
+        return dst
 
     def capture_screen(self, monitor_number=1):
         """Captures the full screen of the specified monitor."""
-        monitor = self.sct.monitors[monitor_number]
-        screenshot = self.sct.grab(monitor)
-        img = np.array(screenshot)
+        self.backend.begin_frame()
+        monitor = self.monitors[monitor_number]
+        img = self.backend.grab(monitor)
         # Convert BGRA to BGR
-        return cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+        return self._to_bgr(img)
 
-    def capture_region(self, region):
+    def capture_region(self, region, monitor_number=None):
         """
         Captures a specific region.
         region: dict with 'top', 'left', 'width', 'height'
+        monitor_number: if given, region is relative to that monitor
+        """
+        self.backend.begin_frame()
+        if monitor_number is not None:
+            monitor = self.monitors[monitor_number]
+            region = dict(region, top=monitor["top"] + region["top"], left=monitor["left"] + region["left"])
+        img = self.backend.grab(region)
+        return self._to_bgr(img)
+
+    def capture_frame(self, frame, monitor_number=1):
+        """
+        Refills a RegionFrame in place.
+        Only the planned boxes are grabbed and color-converted.
+        """
+        self.backend.begin_frame()
+        monitor = self.monitors[monitor_number]
+        for box, plane in zip(frame.boxes, frame.planes):
+            grab = {
+                "top": monitor["top"] + box["top"],
+                "left": monitor["left"] + box["left"],
+                "width": box["width"],
+                "height": box["height"],
+            }
+            self._to_bgr(self.backend.grab(grab), dst=plane)
+        return frame
+
+    def capture_into(self, ring, monitor_number=1, block=True, timeout=None):
+        """
+        Captures the monitor straight into the next slot of a FrameRing
+        (shared memory), without an intermediate copy.
+        Returns the frame's seq, or None if the ring stayed full until timeout.
         """
-        screenshot = self.sct.grab(region)
-        img = np.array(screenshot)
-        return cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+        reserved = ring.begin_write(block, timeout)
+        if reserved is None:
+            return None
+        seq, view = reserved
+        timestamp = time.time()
+        self.backend.begin_frame()
+        self._to_bgr(self.backend.grab(self.monitors[monitor_number]), dst=view)
+        ring.commit(seq, timestamp)
+        return seq
 
     def save_screenshot(self, filename="screenshot.png"):
         """Captures and saves the full screen."""
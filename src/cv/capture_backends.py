@@ -0,0 +1,136 @@
+import os
+import time
+import mss
+import cv2
+import numpy as np
+
+class CaptureBackend:
+    """
+    Source of screen pixels for ScreenCapture.
+    begin_frame() is called once per capture so every region grabbed for one
+    frame comes from the same image; grab() returns a BGRA or BGR array for
+    a region in virtual-screen coordinates (a view whenever possible).
+    """
+    monitors = []
+
+    def begin_frame(self):
+        pass
+
+    def grab(self, region):
+        raise NotImplementedError
+
+class MssBackend(CaptureBackend):
+    """Live screen capture through mss."""
+    def __init__(self):
+        self.sct = mss.mss()
+        self.monitors = self.sct.monitors
+
+    def grab(self, region):
+        screenshot = self.sct.grab(region)
+        return np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(
+            screenshot.height, screenshot.width, 4)
+
+class ReplayBackend(CaptureBackend):
+    """
+    Base for recorded sessions.
+    With replay_rate=None every frame advances to the next recording (as fast
+    as the caller can go); with a replay_rate in frames per second the frame
+    shown follows the wall clock, like the live screen would.
+    """
+    def __init__(self, num_frames, replay_rate=None, loop=True):
+        if num_frames == 0:
+            raise ValueError("Recording has no frames")
+        self.num_frames = num_frames
+        self.replay_rate = replay_rate
+        self.loop = loop
+        self.index = -1
+        self.current = None
+        self._start = None
+
+    def _load(self, index):
+        """Returns frame `index` as a BGR (or BGRA) array."""
+        raise NotImplementedError
+
+    def begin_frame(self):
+        if self.replay_rate:
+            if self._start is None:
+                self._start = time.monotonic()
+            index = int((time.monotonic() - self._start) * self.replay_rate)
+        else:
+            index = self.index + 1
+            
+        if index >= self.num_frames:
+            if not self.loop:
+                raise EOFError("End of recording")
+            index %= self.num_frames
+            
+        if index != self.index or self.current is None:
+            self.current = self._load(index)
+            self.index = index
+            h, w = self.current.shape[:2]
+            monitor = {"top": 0, "left": 0, "width": w, "height": h}
+            self.monitors = [monitor, monitor]
+
+    def grab(self, region):
+        if self.current is None:
+            self.begin_frame()
+        t, l = region["top"], region["left"]
+        return self.current[t:t + region["height"], l:l + region["width"]]
+
+class PngDirectoryBackend(ReplayBackend):
+    """Replays the .png screenshots of a directory in name order."""
+    def __init__(self, directory, replay_rate=None, loop=True, preload=False):
+        # preload: decode every PNG up front (fast replay, more memory)
+        self.paths = [os.path.join(directory, f) for f in sorted(os.listdir(directory))
+                      if f.endswith(".png")]
+        super().__init__(len(self.paths), replay_rate, loop)
+        self.frames = [cv2.imread(p) for p in self.paths] if preload else None
+
+    def _load(self, index):
+        if self.frames is not None:
+            return self.frames[index]
+        return cv2.imread(self.paths[index])
+
+class VideoFileBackend(ReplayBackend):
+    """Replays a recorded video through cv2.VideoCapture."""
+    def __init__(self, path, replay_rate=None, loop=True):
+        self.video = cv2.VideoCapture(path)
+        if not self.video.isOpened():
+            raise IOError(f"Cannot open video {path}")
+        super().__init__(int(self.video.get(cv2.CAP_PROP_FRAME_COUNT)), replay_rate, loop)
+        self._pos = 0 # Index of the frame the next read() returns
+
+    def _load(self, index):
+        if index < self._pos:
+            self.video.set(cv2.CAP_PROP_POS_FRAMES, index)
+            self._pos = index
+        while self._pos < index:
+            self.video.grab() # Skip without decoding
+            self._pos += 1
+        ok, img = self.video.read()
+        if not ok:
+            raise EOFError(f"Cannot read frame {index}")
+        self._pos += 1
+        return img
+
+class RawFrameBackend(ReplayBackend):
+    """
+    Replays a raw uint8 frame file (frames back to back, no header) through
+    a memory map, so every frame is a zero-copy NumPy view.
+    """
+    def __init__(self, path, width, height, channels=3, replay_rate=None, loop=True):
+        frame_size = width * height * channels
+        num_frames = os.path.getsize(path) // frame_size
+        self.frames = np.memmap(path, dtype=np.uint8, mode="r",
+                                shape=(num_frames, height, width, channels))
+        super().__init__(num_frames, replay_rate, loop)
+
+    def _load(self, index):
+        return self.frames[index]
+
+    @staticmethod
+    def record(path, frames):
+        """Appends frames (HxWxC uint8 arrays of one shape) to a raw frame file."""
+        with open(path, "ab") as f:
+            for frame in frames:
+                f.write(np.ascontiguousarray(frame, dtype=np.uint8).tobytes())
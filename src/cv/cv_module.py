@@ -1,16 +1,53 @@
 import cv2
 import numpy as np
 import time
-from .capture import ScreenCapture
-from .detection import CardDetector, StateDetector
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .capture import ScreenCapture, RegionFrame, plan_capture_boxes
+from .detection import CardDetector, StateDetector, to_gray
+from .region_cache import RegionCache
+from .preprocess import FramePreprocessor
+from .hand_tracker import HandTracker, fingerprint, fingerprint_changed
 
 class ComputerVision:
-    def __init__(self, monitor_number=1):
-        self.capture = ScreenCapture()
-        self.card_detector = CardDetector()
-        self.state_detector = StateDetector()
+    def __init__(self, monitor_number=1, capture_mode="full", max_capture_boxes=4,
+                 change_detection=False, preprocessor=None, workers=0, track_hand=False,
+                 recognition_cache=None, capture_backend=None, capture=None,
+                 card_detector=None, state_detector=None, hand_tracker=None):
+        # recognition_cache: optional RecognitionCache shared by both detectors
+        # (and by other ComputerVision instances, e.g. one per table)
+        # capture_backend: optional CaptureBackend, e.g. a recorded session for headless runs
+        # capture, card_detector, state_detector: optional shared instances (multi-table)
+        # hand_tracker: optional HandTracker instance, e.g. tuned for one get_state per turn
+        self.capture = capture or ScreenCapture(capture_backend)
+        self.card_detector = card_detector or CardDetector(cache=recognition_cache)
+        self.state_detector = state_detector or StateDetector(cache=recognition_cache)
         self.monitor_number = monitor_number
         
+        # "full" grabs the whole monitor, "regions" grabs only the boxes
+        # covering the configured regions into a reused buffer.
+        self.capture_mode = capture_mode
+        self.max_capture_boxes = max_capture_boxes
+        self._region_boxes = None
+        self._region_plan_key = None
+        # Released RegionFrames ready for reuse (frames in flight are never overwritten)
+        self._free_frames = []
+        self._frames_lock = threading.Lock()
+        
+        # Reuse the last result of a region while its pixels are unchanged.
+        self.region_cache = RegionCache() if change_detection else None
+        
+        # Per-frame preprocessing (grayscale once per frame, shared by all detectors)
+        self.preprocessor = preprocessor or FramePreprocessor()
+        
+        # workers > 0 runs the region jobs on a thread pool (OpenCV releases the GIL)
+        self.executor = ThreadPoolExecutor(max_workers=workers) if workers > 0 else None
+        
+        # Street-aware tracking: locked cards are not re-read within a hand
+        self.hand_tracker = hand_tracker or (HandTracker() if track_hand else None)
+        # (fingerprint, holding) of the last hole-card check, see hero_has_cards
+        self._hole_check = None
+        
         # Define regions (x, y, w, h)
         # These need to be calibrated by the user or auto-detected.
         # For now, we'll use placeholders or a config dict.
@@ -28,6 +65,8 @@ class ComputerVision:
                 {"top": 600, "left": 960, "width": 50, "height": 70}, # Card 2
             ],
             "pot": {"top": 350, "left": 800, "width": 100, "height": 40},
+            # Tiny patch of the action buttons / timer bar, polled to detect the hero's turn
+            "turn_indicator": {"top": 892, "left": 988, "width": 24, "height": 16},
             "seats": [
                 # 6 seats, need coordinates
                 {"top": 100, "left": 100, "width": 200, "height": 150}, # Seat 0
@@ -43,9 +82,114 @@ class ComputerVision:
         """
         Captures screen and returns the raw CV state.
         """
-        # 1. Capture Full Table
-        # For speed, we might capture specific regions, but full screen is easier to sync.
-        full_img = self.capture.capture_screen(self.monitor_number)
+        frame = self.grab_frame()
+        try:
+            return self.detect(frame)
+        finally:
+            self.release_frame(frame)
+
+    def hero_to_act(self):
+        """
+        Cheap turn trigger: grabs only the turn indicator region and checks it.
+        Meant to be polled at high frequency before running get_state.
+        """
+        img = self.capture.capture_region(self.regions["turn_indicator"], self.monitor_number)
+        return self.state_detector.is_hero_turn(img)
+
+    def hero_has_cards(self):
+        """
+        Cheap "is the hero in the hand" check for the turn poller: grabs one
+        box around the hole cards and only reads them again when its pixels
+        change. False while folded or between hands.
+        """
+        hole = self.regions["my_hand"]
+        box = plan_capture_boxes(hole, 1)[0]
+        img = self.capture.capture_region(box, self.monitor_number)
+        crops = [to_gray(img[r["top"] - box["top"]:r["top"] - box["top"] + r["height"],
+                             r["left"] - box["left"]:r["left"] - box["left"] + r["width"]])
+                 for r in hole]
+        fp = fingerprint(crops)
+        if self._hole_check is not None and not fingerprint_changed(fp, self._hole_check[0]):
+            return self._hole_check[1]
+        holding = any(self._read_card(crop) != "NoCard" for crop in crops)
+        self._hole_check = (fp, holding)
+        return holding
+
+    def turn_time_left(self):
+        """
+        Fraction (0-1) of the action clock left, read from the optional
+        'timer_bar' region, or None if there is no such region.
+        """
+        if "timer_bar" not in self.regions:
+            return None
+        img = self.capture.capture_region(self.regions["timer_bar"], self.monitor_number)
+        return self.state_detector.timer_fraction(img)
+
+    def grab_frame(self, regions=None):
+        """
+        Captures the table (full monitor or region boxes, see capture_mode).
+        In "regions" mode the frame must be handed back with release_frame.
+        regions: layout to capture for (default self.regions); pass the same
+        snapshot to detect() if self.regions may be replaced in between.
+        """
+        if self.capture_mode == "regions":
+            return self.capture.capture_frame(self._get_region_frame(regions), self.monitor_number)
+        return self.capture.capture_screen(self.monitor_number)
+
+    def release_frame(self, frame):
+        """Returns a RegionFrame to the pool once detection is done with it."""
+        if not isinstance(frame, RegionFrame):
+            return
+        with self._frames_lock:
+            if frame.boxes is self._region_boxes:
+                self._free_frames.append(frame)
+
+    def detect(self, frame, preprocessor=None, regions=None):
+        """
+        Returns the raw CV state for an already captured frame.
+        preprocessor: optional FramePreprocessor, needed when several threads
+        call detect at once (its buffers are reused between frames).
+        regions: the layout the frame was grabbed with (default self.regions).
+        """
+        regions = regions or self.regions
+        # 1. Preprocess the frame once for all detectors; a full monitor
+        # grab is only converted inside the boxes covering the regions
+        boxes = None if isinstance(frame, RegionFrame) else self._capture_boxes(regions)
+        planes = (preprocessor or self.preprocessor).process(frame, boxes)
+        full_img = planes["gray"]
+        
+        # 2. Decide which card slots need reading
+        hand_slots = list(range(len(regions["my_hand"])))
+        board_slots = list(range(len(regions["community_cards"])))
+        if self.hand_tracker is not None:
+            hole_crops = [self._crop(full_img, r) for r in regions["my_hand"]]
+            board_crops = [self._crop(full_img, r) for r in regions["community_cards"]]
+            if self.hand_tracker.check_new_hand(hole_crops, board_crops):
+                self.invalidate_cache()
+            hand_slots, board_slots = self.hand_tracker.slots_to_read()
+        
+        # 3. Collect independent region jobs in a fixed order
+        jobs = []
+        for i in hand_slots:
+            jobs.append((f"hand_{i}", self._crop(full_img, regions["my_hand"][i]), self._read_card))
+        for i in board_slots:
+            jobs.append((f"board_{i}", self._crop(full_img, regions["community_cards"][i]), self._read_card))
+        jobs.append(("pot", self._crop(full_img, regions["pot"]), self.state_detector.get_number_from_region))
+        seat_crops = [self._crop(full_img, r) for r in regions["seats"]]
+        batched_seats = self.state_detector.seat_classifier is not None
+        for i, seat_crop in enumerate(seat_crops):
+            if batched_seats:
+                # Statuses come from one batched call below, only stacks are per seat
+                jobs.append((f"stack_{i}", self._stack_crop(seat_crop), self.state_detector.get_number_from_region))
+            else:
+                jobs.append((f"seat_{i}", seat_crop, self._read_seat))
+            
+        # 4. Run them (serially or on the pool); results keep the job order
+        if self.executor is not None:
+            results = list(self.executor.map(lambda job: self._detect(*job), jobs))
+        else:
+            results = [self._detect(*job) for job in jobs]
+        results = dict(zip([job[0] for job in jobs], results))
         
         state = {
             "hand": [],
@@ -54,34 +198,26 @@ class ComputerVision:
             "players": []
         }
         
-        # 2. Detect My Hand
-        for region in self.regions["my_hand"]:
-            crop = self._crop(full_img, region)
-            card = self.card_detector.match_card(crop)
-            state["hand"].append(card if card else "NoCard")
-            
-        # 3. Detect Board
-        for region in self.regions["community_cards"]:
-            crop = self._crop(full_img, region)
-            card = self.card_detector.match_card(crop)
-            state["board"].append(card if card else "NoCard")
+        # 5. Cards (merged with the locked ones when tracking the hand)
+        hand_reads = {i: results[f"hand_{i}"] for i in hand_slots}
+        board_reads = {i: results[f"board_{i}"] for i in board_slots}
+        if self.hand_tracker is not None:
+            state["hand"], state["board"] = self.hand_tracker.update(hand_reads, board_reads)
+        else:
+            state["hand"] = [hand_reads[i] for i in hand_slots]
+            state["board"] = [board_reads[i] for i in board_slots]
             
-        # 4. Detect Pot
-        pot_crop = self._crop(full_img, self.regions["pot"])
-        state["pot"] = self.state_detector.get_number_from_region(pot_crop)
+        # 6. Pot
+        state["pot"] = results["pot"]
         
-        # 5. Detect Players
-        for i, seat_region in enumerate(self.regions["seats"]):
-            seat_crop = self._crop(full_img, seat_region)
-            
-            # Status
-            status = self.state_detector.get_seat_status(seat_crop)
-            
-            # Stack (Need a sub-region for stack within seat region, simplified here)
-            # Assuming stack is in bottom half of seat region
-            h, w = seat_crop.shape[:2]
-            stack_crop = seat_crop[h//2:, :] 
-            stack = self.state_detector.get_number_from_region(stack_crop)
+        # 7. Players
+        if batched_seats:
+            statuses = self.state_detector.get_seat_statuses(seat_crops)
+        for i, _ in enumerate(regions["seats"]):
+            if batched_seats:
+                status, stack = statuses[i], results[f"stack_{i}"]
+            else:
+                status, stack = results[f"seat_{i}"]
             
             # Bet (Need sub-region)
             bet = 0.0 # Placeholder
@@ -95,7 +231,79 @@ class ComputerVision:
             
         return state
 
+    def close(self):
+        """Shuts down the detection thread pool, if any."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    def _read_card(self, crop):
+        card = self.card_detector.match_card(crop)
+        return card if card else "NoCard"
+
+    def _read_seat(self, seat_crop):
+        # Status
+        status = self.state_detector.get_seat_status(seat_crop)
+        
+        stack = self.state_detector.get_number_from_region(self._stack_crop(seat_crop))
+        return status, stack
+
+    def _stack_crop(self, seat_crop):
+        # Stack (Need a sub-region for stack within seat region, simplified here)
+        # Assuming stack is in bottom half of seat region
+        h, w = seat_crop.shape[:2]
+        return seat_crop[h//2:, :]
+
+    def _detect(self, key, crop, detect_fn):
+        """Runs detect_fn on the crop, or returns the cached result if the region is unchanged."""
+        if self.region_cache is None:
+            return detect_fn(crop)
+        return self.region_cache.get(key, crop, detect_fn)
+
+    def invalidate_cache(self, keys=None):
+        """Forgets cached region results, e.g. when a new hand starts."""
+        if self.region_cache is not None:
+            self.region_cache.invalidate(keys)
+
+    def _get_region_frame(self, regions=None):
+        """
+        Returns a free RegionFrame for the current regions.
+        The capture plan is rebuilt only when the regions change.
+        """
+        with self._frames_lock:
+            boxes = self._plan_boxes(regions or self.regions)
+            if self._free_frames:
+                return self._free_frames.pop()
+            return RegionFrame(boxes)
+
+    def _capture_boxes(self, regions):
+        """Boxes covering the regions (same plan as the "regions" capture mode)."""
+        with self._frames_lock:
+            return self._plan_boxes(regions)
+
+    def _plan_boxes(self, regions):
+        # Caller holds _frames_lock
+        regions = list(self._iter_regions(regions))
+        key = tuple((r["top"], r["left"], r["width"], r["height"]) for r in regions)
+        if self._region_boxes is None or key != self._region_plan_key:
+            self._region_boxes = plan_capture_boxes(regions, self.max_capture_boxes)
+            self._region_plan_key = key
+            self._free_frames = []
+        return self._region_boxes
+
+    def _iter_regions(self, regions=None):
+        """Yields every region read by get_state ('table', 'turn_indicator' and 'timer_bar' are not read)."""
+        for name, value in (regions or self.regions).items():
+            if name in ("table", "turn_indicator", "timer_bar"):
+                continue
+            if isinstance(value, dict):
+                yield value
+            else:
+                yield from value
+
     def _crop(self, img, region):
+        if isinstance(img, RegionFrame):
+            return img.crop(region)
         t, l, w, h = region["top"], region["left"], region["width"], region["height"]
         return img[t:t+h, l:l+w]
 
@@ -1,33 +1,116 @@
 import cv2
 import numpy as np
 import os
+from .recognition import BatchMatcher, MatchResult, PyramidMatcher
+from .template_bundle import find_bundle
+from .seat_classifier import SeatClassifier
+
+def to_gray(image):
+    """Returns a grayscale view; crops from the preprocessed gray plane pass through untouched."""
+    if image.ndim == 2:
+        return image
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
 class CardDetector:
-    def __init__(self, templates_dir="data/templates/cards"):
+    # Sub-windows of a card region holding the rank glyph and the suit pip,
+    # as fractions (x, y, w, h) of the region size.
+    RANK_WINDOW = (0.0, 0.0, 0.6, 0.45)
+    SUIT_WINDOW = (0.0, 0.35, 0.6, 0.4)
+
+    def __init__(self, templates_dir="data/templates/cards", engine="batched",
+                 rank_window=None, suit_window=None, pyramid_levels=1, cache=None):
+        # engine: "batched" scores the whole deck in one pass (BatchMatcher),
+        # "pyramid" matches coarse-to-fine with early exit (PyramidMatcher),
+        # "loop" runs cv2.matchTemplate once per template.
+        # pyramid_levels: one pyrDown step by default; at quarter scale the
+        # rank glyphs of card-sized templates blur together
         self.templates_dir = templates_dir
+        self.engine = engine
+        # Optional RecognitionCache (perceptual-hash LRU), may be shared between detectors
+        self.cache = cache
+        # Compiled bundle (tools/compile_templates.py) if there is one, else PNGs
+        self.bundle = find_bundle(templates_dir)
         self.templates = self._load_templates()
+        self.matcher = BatchMatcher(self.templates, normalized=self._bundle_field("normalized"))
+        self.pyramid = PyramidMatcher(self.templates, levels=pyramid_levels,
+                                      pyramids=self._bundle_field("pyramids")) if engine == "pyramid" else None
+        
+        # Factorized mode: 13 rank glyphs in ranks/ (A.png, K.png, ...) and
+        # 4 suit pips in suits/ (s.png, h.png, ...). Full-card templates stay as fallback.
+        self.rank_window = rank_window or self.RANK_WINDOW
+        self.suit_window = suit_window or self.SUIT_WINDOW
+        self.rank_templates = self._load_templates(os.path.join(templates_dir, "ranks"))
+        self.suit_templates = self._load_templates(os.path.join(templates_dir, "suits"))
+        self.rank_matcher = BatchMatcher(self.rank_templates, normalized=self._bundle_field("normalized", "ranks"))
+        self.suit_matcher = BatchMatcher(self.suit_templates, normalized=self._bundle_field("normalized", "suits"))
 
-    def _load_templates(self):
+    def _bundle_field(self, field, prefix=""):
+        if self.bundle is None:
+            return None
+        return getattr(self.bundle.subset(prefix), field)
+
+    def _load_templates(self, templates_dir=None):
+        templates_dir = templates_dir or self.templates_dir
+        if self.bundle is not None:
+            prefix = os.path.relpath(templates_dir, self.templates_dir)
+            return dict(self.bundle.subset("" if prefix == "." else prefix).templates)
+            
         templates = {}
-        if not os.path.exists(self.templates_dir):
+        if not os.path.exists(templates_dir):
             return templates
             
-        for filename in os.listdir(self.templates_dir):
+        for filename in os.listdir(templates_dir):
             if filename.endswith(".png"):
                 name = filename.split(".")[0]
-                img = cv2.imread(os.path.join(self.templates_dir, filename), 0) # Load as grayscale
+                img = cv2.imread(os.path.join(templates_dir, filename), 0) # Load as grayscale
                 templates[name] = img
         return templates
 
+    @property
+    def factorized(self):
+        return bool(self.rank_templates) and bool(self.suit_templates)
+
     def match_card(self, image_region, threshold=0.8):
         """
         Matches a card in the given image region.
         Returns (rank, suit) or None.
         """
-        gray = cv2.cvtColor(image_region, cv2.COLOR_BGR2GRAY)
-        best_match = None
-        best_val = -1
-        
+        gray = to_gray(image_region)
+        if self.cache is None:
+            return self._recognize(gray, threshold)[0]
+            
+        key = self.cache.key(gray, "card")
+        card = self.cache.get(key)
+        if card is self.cache.MISS:
+            card, score = self._recognize(gray, threshold)
+            self.cache.put(key, card, score)
+        return card
+
+    def _recognize(self, gray, threshold):
+        """Returns (card or None, confidence)."""
+        if self.factorized:
+            card, score = self._match_factorized(gray, threshold)
+            if card is not None:
+                return card, score
+                
+        result = self.match_card_scored(gray, threshold)
+        if result is not None and result.score > threshold:
+            return self._format_card(result.name), result.score
+        return None, 0.0
+
+    def match_card_scored(self, image_region, threshold=0.8):
+        """
+        Scores the region against every card template.
+        Returns a MatchResult (best name, score, margin over the runner-up) or None.
+        threshold is only used by the pyramid engine to exit early.
+        """
+        gray = to_gray(image_region)
+        if self.engine == "batched":
+            return self.matcher.match(gray)
+        if self.engine == "pyramid":
+            return self.pyramid.match(gray, threshold)
+
+        scores = []
         for name, template in self.templates.items():
             # Resize template if needed or ensure region is larger
             if template.shape[0] > gray.shape[0] or template.shape[1] > gray.shape[1]:
@@ -35,28 +118,78 @@ class CardDetector:
                 
             res = cv2.matchTemplate(gray, template, cv2.TM_CCOEFF_NORMED)
             min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(res)
+            scores.append((max_val, name))
             
-            if max_val > best_val:
-                best_val = max_val
-                best_match = name
-                
-        if best_val > threshold:
-            # Assuming template names like 'Ah', 'Ks', '2d'
-            # Or separate rank/suit templates. 
-            # For simplicity, let's assume full card templates for now or rank/suit separate.
-            # If full card: 'Ah' -> ('A', 'h')
-            if len(best_match) == 2:
-                return best_match[0], best_match[1]
-            return best_match
+        if not scores:
+            return None
+        scores.sort(reverse=True)
+        best_val, best_match = scores[0]
+        runner_up = scores[1][0] if len(scores) > 1 else 0.0
+        return MatchResult(best_match, best_val, best_val - runner_up)
+
+    def match_card_factorized(self, image_region, threshold=0.8):
+        """
+        Recognizes the rank glyph and the suit pip separately (13 + 4 templates).
+        Returns (rank, suit) or None if either part is below threshold.
+        """
+        return self._match_factorized(to_gray(image_region), threshold)[0]
+
+    def _match_factorized(self, gray, threshold):
+        rank = self.rank_matcher.match(self._sub_window(gray, self.rank_window))
+        if rank is None or rank.score <= threshold:
+            return None, 0.0
             
-        return None
+        suit = self.suit_matcher.match(self._sub_window(gray, self.suit_window))
+        if suit is None or suit.score <= threshold:
+            return None, 0.0
+            
+        return (rank.name, suit.name), min(rank.score, suit.score)
+
+    def _sub_window(self, img, window):
+        h, w = img.shape[:2]
+        x, y, ww, wh = window
+        return img[int(y * h):int((y + wh) * h), int(x * w):int((x + ww) * w)]
+
+    def _format_card(self, name):
+        # Assuming template names like 'Ah', 'Ks', '2d'
+        # Or separate rank/suit templates. 
+        # For simplicity, let's assume full card templates for now or rank/suit separate.
+        # If full card: 'Ah' -> ('A', 'h')
+        if len(name) == 2:
+            return name[0], name[1]
+        return name
 
 class StateDetector:
-    def __init__(self, templates_dir="data/templates/state"):
+    # Separator templates for the number reader: 'dot.png' and 'comma.png'.
+    # The decimal one is kept, the thousands one is dropped.
+    SEPARATORS = {"dot": ".", "comma": ","}
+
+    def __init__(self, templates_dir="data/templates/state", pyramid_levels=0,
+                 ocr_engine="vectorized", decimal_separator=".", cache=None,
+                 seats_dir="data/templates/seats"):
+        # pyramid_levels > 0 makes find_template search coarse-to-fine (PyramidMatcher).
+        # ocr_engine: "vectorized" (stacked response maps + 1-D NMS),
+        # "segment" (connected components + nearest-neighbour glyphs) or "legacy".
         self.templates_dir = templates_dir
+        self.ocr_engine = ocr_engine
+        self.decimal_separator = decimal_separator
+        # Optional RecognitionCache for number reads (not used by the legacy reader, which has no score)
+        self.cache = cache
+        self.bundle = find_bundle(templates_dir)
         self.templates = self._load_templates()
+        pyramids = self.bundle.subset().pyramids if self.bundle is not None else None
+        self.pyramid = PyramidMatcher(self.templates, levels=pyramid_levels,
+                                      pyramids=pyramids) if pyramid_levels > 0 else None
+        self.glyph_classifier = self._build_glyph_classifier()
+        self.turn_histogram = self._load_turn_histogram()
+        # Batched seat classifier, if reference samples were collected
+        classifier = SeatClassifier(seats_dir)
+        self.seat_classifier = classifier if classifier.available else None
         
     def _load_templates(self):
+        if self.bundle is not None:
+            return dict(self.bundle.subset().templates)
+            
         templates = {}
         if not os.path.exists(self.templates_dir):
             return templates
@@ -73,12 +206,18 @@ class StateDetector:
             return None
             
         template = self.templates[template_name]
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = to_gray(image)
         
         # Ensure image is larger than template
         if gray.shape[0] < template.shape[0] or gray.shape[1] < template.shape[1]:
             return None
             
+        if self.pyramid is not None:
+            result = self.pyramid.match(gray, threshold, names=[template_name])
+            if result is not None and result.score > threshold:
+                return result.loc
+            return None
+            
         res = cv2.matchTemplate(gray, template, cv2.TM_CCOEFF_NORMED)
         min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(res)
         
@@ -94,6 +233,20 @@ class StateDetector:
         if image_region is None or image_region.size == 0:
             return 0.0
             
+        if self.ocr_engine in ("vectorized", "segment"):
+            gray = to_gray(image_region)
+            reader = self._read_number_vectorized if self.ocr_engine == "vectorized" else self._read_number_segmented
+            if self.cache is None:
+                return reader(gray)[0]
+                
+            # Numbers differ by a glyph or two, too little for pHash
+            key = self.cache.key(gray, "number", exact=True)
+            value = self.cache.get(key)
+            if value is self.cache.MISS:
+                value, confidence = reader(gray)
+                self.cache.put(key, value, confidence)
+            return value
+            
         # This is a simplified version. A robust OCR would use Tesseract or a CNN.
         # For template matching digits:
         # 1. Find all occurrences of 0-9.
@@ -101,7 +254,7 @@ class StateDetector:
         # 3. Construct string.
         
         found_digits = []
-        gray = cv2.cvtColor(image_region, cv2.COLOR_BGR2GRAY)
+        gray = to_gray(image_region)
         
         for i in range(10):
             digit_name = str(i)
@@ -147,6 +300,224 @@ class StateDetector:
         except:
             return 0.0
 
+    def _read_number_vectorized(self, gray, threshold=0.85, min_gap_ratio=0.6):
+        """
+        Reads a number in one pass over stacked response maps.
+        Every glyph's response map is padded into one (n, H, W) stack; the
+        per-pixel argmax gives the best glyph at each location, the best row
+        per column gives a 1-D profile along x, and non-maximum suppression
+        on that profile leaves one glyph per character position.
+        Returns (value, confidence), confidence being the weakest kept peak.
+        """
+        glyphs = [str(i) for i in range(10)] + list(self.SEPARATORS)
+        glyphs = [g for g in glyphs if g in self.templates and
+                  self.templates[g].shape[0] <= gray.shape[0] and
+                  self.templates[g].shape[1] <= gray.shape[1]]
+        if not glyphs:
+            return 0.0, 0.0
+            
+        maps = [cv2.matchTemplate(gray, self.templates[g], cv2.TM_CCOEFF_NORMED) for g in glyphs]
+        H = max(m.shape[0] for m in maps)
+        W = max(m.shape[1] for m in maps)
+        stack = np.full((len(maps), H, W), -1.0, dtype=np.float32)
+        for i, m in enumerate(maps):
+            stack[i, :m.shape[0], :m.shape[1]] = m
+            
+        best = stack.max(axis=0)
+        labels = stack.argmax(axis=0)
+        rows = best.argmax(axis=0)
+        cols = np.arange(W)
+        profile = best[rows, cols]
+        profile_labels = labels[rows, cols]
+        
+        # 1-D NMS: keep columns that are the maximum within +-gap and above threshold
+        widths = np.array([self.templates[g].shape[1] for g in glyphs])
+        gap = max(1, int(widths.min() * min_gap_ratio))
+        padded = np.pad(profile, gap, constant_values=-1.0)
+        local_max = np.lib.stride_tricks.sliding_window_view(padded, 2 * gap + 1).max(axis=1)
+        peaks = np.flatnonzero((profile >= threshold) & (profile >= local_max))
+        if len(peaks) == 0:
+            return 0.0, 0.0
+            
+        # Peaks closer than the left glyph's own width overlap; keep the stronger one
+        kept = [peaks[0]]
+        for x in peaks[1:]:
+            if x - kept[-1] < widths[profile_labels[kept[-1]]] * min_gap_ratio:
+                if profile[x] > profile[kept[-1]]:
+                    kept[-1] = x
+                continue
+            kept.append(x)
+        peaks = np.array(kept)
+        
+        chars = []
+        for label in profile_labels[peaks]:
+            glyph = glyphs[label]
+            char = self.SEPARATORS.get(glyph, glyph)
+            if char in self.SEPARATORS.values():
+                if char != self.decimal_separator:
+                    continue # Thousands separator
+                char = "."
+            chars.append(char)
+            
+        try:
+            return float("".join(chars)), float(profile[peaks].min())
+        except ValueError:
+            return 0.0, 0.0
+
+    GLYPH_SIZE = (12, 16) # (w, h) every glyph is normalized to
+
+    def _binarize(self, gray):
+        """Otsu threshold, flipped if needed so the text is white on black."""
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        if np.count_nonzero(binary) > binary.size // 2:
+            binary = cv2.bitwise_not(binary)
+        return binary
+
+    def _glyph_vector(self, binary):
+        glyph = cv2.resize(binary, self.GLYPH_SIZE, interpolation=cv2.INTER_AREA)
+        return glyph.astype(np.float32).ravel() / 255.0
+
+    def _build_glyph_classifier(self):
+        """
+        Turns the loaded digit/separator templates into normalized glyph vectors.
+        Returns {"digits": (labels, matrix), "separators": (labels, matrix)}.
+        """
+        classifier = {}
+        groups = {
+            "digits": [str(i) for i in range(10)],
+            "separators": list(self.SEPARATORS),
+        }
+        for group, names in groups.items():
+            labels, vectors = [], []
+            for name in names:
+                template = self.templates.get(name)
+                if template is None:
+                    continue
+                binary = self._binarize(template)
+                ys, xs = np.nonzero(binary)
+                if len(xs) == 0:
+                    continue
+                ink = binary[ys.min():ys.max() + 1, xs.min():xs.max() + 1]
+                labels.append(self.SEPARATORS.get(name, name))
+                vectors.append(self._glyph_vector(ink))
+            if vectors:
+                classifier[group] = (labels, np.stack(vectors))
+        return classifier
+
+    def _read_number_segmented(self, gray, min_area=3, max_distance=0.35):
+        """
+        Reads a number by segmentation instead of sliding templates.
+        The region is binarized once, glyph boxes come from connected
+        components, and each glyph is classified by nearest neighbour against
+        the digit templates. Cost depends on the glyph count, not region width.
+        Returns (value, confidence), confidence being 1 - the worst glyph distance.
+        """
+        if "digits" not in self.glyph_classifier:
+            return 0.0, 0.0
+            
+        binary = self._binarize(gray)
+        n, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        boxes = stats[1:] # Skip background
+        boxes = boxes[boxes[:, cv2.CC_STAT_AREA] >= min_area]
+        if len(boxes) == 0:
+            return 0.0, 0.0
+        boxes = boxes[np.argsort(boxes[:, cv2.CC_STAT_LEFT])]
+        
+        # Glyphs much shorter than the tallest one can only be separators
+        tallest = boxes[:, cv2.CC_STAT_HEIGHT].max()
+        
+        chars = []
+        worst = 0.0
+        for x, y, w, h, _ in boxes:
+            group = "digits" if h >= tallest * 0.5 else "separators"
+            if group not in self.glyph_classifier:
+                # No separator templates: a short component could be a comma
+                # as well as a decimal point, so it is dropped
+                continue
+                
+            labels, matrix = self.glyph_classifier[group]
+            vector = self._glyph_vector(binary[y:y + h, x:x + w])
+            distances = np.sqrt(((matrix - vector) ** 2).mean(axis=1))
+            best = int(distances.argmin())
+            if distances[best] > max_distance:
+                continue
+                
+            worst = max(worst, float(distances[best]))
+            char = labels[best]
+            if char in self.SEPARATORS.values():
+                if char != self.decimal_separator:
+                    continue # Thousands separator
+                char = "."
+            chars.append(char)
+            
+        try:
+            return float("".join(chars)), 1.0 - worst
+        except ValueError:
+            return 0.0, 0.0
+
+    # Templates that only show up while the hero is to act
+    TURN_TEMPLATES = ("action_buttons", "timer_bar")
+
+    def _load_turn_histogram(self):
+        """
+        Hue/saturation histogram of 'hero_turn.png' (a color sample of the
+        action buttons or timer bar), or None if there is no such sample.
+        """
+        path = os.path.join(self.templates_dir, "hero_turn.png")
+        if not os.path.exists(path):
+            return None
+        sample = cv2.imread(path)
+        return self._color_histogram(sample)
+
+    def _color_histogram(self, image):
+        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+        hist = cv2.calcHist([hsv], [0, 1], None, [16, 8], [0, 180, 0, 256])
+        return cv2.normalize(hist, hist).flatten()
+
+    @property
+    def can_detect_turn(self):
+        return self.turn_histogram is not None or any(t in self.templates for t in self.TURN_TEMPLATES)
+
+    def is_hero_turn(self, region_img, threshold=0.8):
+        """
+        Cheap check whether the hero is to act, meant to run on a tiny region
+        (a few hundred pixels) around the action buttons or timer bar.
+        Uses the color histogram sample if there is one, else the turn templates.
+        """
+        if region_img is None or region_img.size == 0:
+            return False
+            
+        if self.turn_histogram is not None and region_img.ndim == 3:
+            hist = self._color_histogram(region_img)
+            return cv2.compareHist(self.turn_histogram, hist, cv2.HISTCMP_CORREL) > threshold
+            
+        gray = to_gray(region_img)
+        for name in self.TURN_TEMPLATES:
+            if self.find_template(gray, name, threshold) is not None:
+                return True
+        return False
+
+    def timer_fraction(self, region_img, min_saturation=80, min_value=80):
+        """
+        Fraction of a horizontal timer bar that is still lit (0-1).
+        A column counts as lit if most of its pixels are saturated and bright.
+        """
+        if region_img is None or region_img.size == 0 or region_img.ndim != 3:
+            return None
+        hsv = cv2.cvtColor(region_img, cv2.COLOR_BGR2HSV)
+        lit = (hsv[:, :, 1] >= min_saturation) & (hsv[:, :, 2] >= min_value)
+        return float((lit.mean(axis=0) > 0.5).mean())
+
+    def get_seat_statuses(self, seat_regions):
+        """
+        Statuses of all seats at once: 'active', 'folded', 'empty',
+        'sitting_out' or 'all_in' from the batched classifier, or per seat
+        with get_seat_status if no reference samples are available.
+        """
+        if self.seat_classifier is not None:
+            return self.seat_classifier.classify(seat_regions)
+        return [self.get_seat_status(r) for r in seat_regions]
+
     def get_seat_status(self, seat_region):
         """
         Determines status of a seat: 'empty', 'active', 'folded'.
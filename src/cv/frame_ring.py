@@ -0,0 +1,147 @@
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+import numpy as np
+
+# seq: frame sequence number, timestamp: capture time (time.time()), view: frame pixels (no copy)
+RingFrame = namedtuple("RingFrame", ["seq", "timestamp", "view"])
+
+class FrameRing:
+    """
+    Ring buffer of frames in multiprocessing.shared_memory.
+    One writer (the capture process) and `num_readers` reader processes.
+    Frames are split between readers by sequence number (reader i gets
+    seq % num_readers == i), so detection scales across processes without
+    locks and without pickling frames.
+
+    Each slot carries a header [begin_seq, end_seq, released_seq, timestamp].
+    The writer sets begin_seq before touching the pixels and end_seq after,
+    so a reader can tell a frame that is complete (begin == end == seq) from
+    one that is being, or has been, overwritten (torn).
+    """
+    HEADER_FIELDS = 4
+
+    def __init__(self, shape, num_slots=4, num_readers=1, name=None, create=True):
+        # shape: frame shape, e.g. (1080, 1920, 3); frames are uint8
+        self.shape = tuple(shape)
+        self.num_slots = num_slots
+        self.num_readers = num_readers
+        self.frame_bytes = int(np.prod(self.shape))
+        header_bytes = num_slots * self.HEADER_FIELDS * 8
+        
+        if create:
+            self.shm = shared_memory.SharedMemory(create=True, name=name,
+                                                  size=header_bytes + num_slots * self.frame_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.owner = create
+        
+        self.header = np.ndarray((num_slots, self.HEADER_FIELDS), dtype=np.float64, buffer=self.shm.buf)
+        self.frames = np.ndarray((num_slots,) + self.shape, dtype=np.uint8,
+                                 buffer=self.shm.buf, offset=header_bytes)
+        if create:
+            self.header[:] = -1 # No frame written or released yet
+            
+        self.next_seq = 0
+        self.cursors = list(range(num_readers)) # Next seq per reader (reader side only)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def __getstate__(self):
+        # Pickling (e.g. as a multiprocessing.Process argument) attaches instead of copying
+        return {"shape": self.shape, "num_slots": self.num_slots,
+                "num_readers": self.num_readers, "name": self.name}
+
+    def __setstate__(self, state):
+        self.__init__(state["shape"], state["num_slots"], state["num_readers"],
+                      name=state["name"], create=False)
+
+    # Writer side
+
+    def begin_write(self, block=True, timeout=None):
+        """
+        Reserves the next slot and returns (seq, view) to capture into.
+        If the frame previously in that slot has not been released yet:
+        block=True waits for it (returns None on timeout), block=False
+        overwrites it and readers still holding it will see it as torn.
+        """
+        seq = self.next_seq
+        slot = seq % self.num_slots
+        previous = seq - self.num_slots
+        
+        if block and previous >= 0:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while self.header[slot, 2] < previous:
+                if deadline is not None and time.monotonic() > deadline:
+                    return None
+                time.sleep(0.0005)
+                
+        self.header[slot, 0] = seq
+        return seq, self.frames[slot]
+
+    def commit(self, seq, timestamp=None):
+        """Publishes the frame written into the slot reserved for `seq`."""
+        slot = seq % self.num_slots
+        self.header[slot, 3] = time.time() if timestamp is None else timestamp
+        self.header[slot, 1] = seq
+        self.next_seq = seq + 1
+
+    def write(self, frame, timestamp=None, block=True, timeout=None):
+        """Copies a frame in. Returns its seq, or None if dropped on timeout."""
+        reserved = self.begin_write(block, timeout)
+        if reserved is None:
+            return None
+        seq, view = reserved
+        np.copyto(view, frame)
+        self.commit(seq, timestamp)
+        return seq
+
+    # Reader side
+
+    def read(self, reader_id=0, timeout=None):
+        """
+        Returns the next RingFrame for this reader (a view into shared memory),
+        or None on timeout. If the writer has lapped the reader, frames it
+        missed are skipped.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            seq = self.cursors[reader_id]
+            slot = seq % self.num_slots
+            begin, end, _, timestamp = self.header[slot]
+            
+            if begin == end == seq:
+                view = self.frames[slot]
+                # Re-check after taking the view: the writer may have started on the slot
+                if self.header[slot, 0] == seq:
+                    return RingFrame(seq, timestamp, view)
+            elif end > seq:
+                # Lapped: jump to this reader's first frame still in the ring
+                oldest = int(self.header[:, 1].max()) - self.num_slots + 1
+                steps = max(1, -(-(oldest - seq) // self.num_readers))
+                self.cursors[reader_id] = seq + steps * self.num_readers
+                continue
+                
+            if deadline is not None and time.monotonic() > deadline:
+                return None
+            time.sleep(0.0005)
+
+    def is_valid(self, frame):
+        """True while the frame has not started being overwritten (check after processing)."""
+        return self.header[frame.seq % self.num_slots, 0] == frame.seq
+
+    def release(self, frame, reader_id=0):
+        """Hands the slot back to the writer and moves this reader on."""
+        slot = frame.seq % self.num_slots
+        if self.header[slot, 0] == frame.seq:
+            self.header[slot, 2] = frame.seq
+        self.cursors[reader_id] = frame.seq + self.num_readers
+
+    def close(self):
+        # Views must go before the mapping can be closed
+        del self.header, self.frames
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,147 @@
+import threading
+import cv2
+import numpy as np
+
+def fingerprint(crops, size=(8, 8)):
+    """Grayscale crops shrunk to a size[0] x size[1] grid each, as one int16 vector (None if all are empty)."""
+    cells = [cv2.resize(c, size, interpolation=cv2.INTER_AREA)
+             for c in crops if c is not None and c.size > 0]
+    if not cells:
+        return None
+    return np.concatenate([c.astype(np.int16).ravel() for c in cells])
+
+def fingerprint_changed(fp, reference, tolerance=24):
+    return fp.shape != reference.shape or np.abs(fp - reference).max() > tolerance
+
+class HandTracker:
+    """
+    Hand-level state machine: preflop -> flop -> turn -> river -> showdown.
+    Cards are locked once they have been read identically on `confirm_frames`
+    consecutive frames, and only the slots that can still change are probed:
+    the unlocked hole cards and the unlocked board slots of the current and
+    next street, so a street is picked up while the previous one confirms.
+    A new hand resets everything; it is detected when the pixels of the
+    locked hole cards or of a locked board card change, or when cards show
+    up in a hole region that was read as empty.
+    """
+    STREETS = ["preflop", "flop", "turn", "river", "showdown"]
+    # Board slots dealt when leaving each street
+    NEXT_SLOTS = {"preflop": [0, 1, 2], "flop": [3], "turn": [4], "river": [], "showdown": []}
+
+    def __init__(self, confirm_frames=2, change_tolerance=24, fingerprint_size=(8, 8)):
+        # change_tolerance: max per-cell difference of the hole-card fingerprint within one hand
+        self.confirm_frames = confirm_frames
+        self.change_tolerance = change_tolerance
+        self.fingerprint_size = fingerprint_size
+        self._lock = threading.Lock()
+        self._hole_fp = None
+        self._board_fp = [None] * 5
+        self.hands_seen = 0
+        self.reset()
+
+    def reset(self):
+        """Forgets the current hand."""
+        self.street = "preflop"
+        self.hand = [None, None]
+        self.board = [None] * 5
+        # Set while both hole slots read as NoCard (hero not dealt in)
+        self._hole_empty = False
+        # slot key -> (last read, consecutive count)
+        self._pending = {}
+
+    def _fingerprint(self, crops):
+        return fingerprint(crops, self.fingerprint_size)
+
+    def _changed(self, fp, reference):
+        return fingerprint_changed(fp, reference, self.change_tolerance)
+
+    def check_new_hand(self, hole_crops, board_crops=None):
+        """
+        Compares the hole-card pixels with those of the locked hand (or of
+        the empty hole region) and the board pixels with the locked board
+        cards. Resets the tracker and returns True when a new hand has started.
+        """
+        fp = self._fingerprint(hole_crops)
+        board_fps = [self._fingerprint([c]) for c in board_crops or []]
+        with self._lock:
+            new_hand = False
+            if fp is not None:
+                if self._hole_fp is None:
+                    self._hole_fp = fp
+                elif all(c is not None for c in self.hand):
+                    new_hand = self._changed(fp, self._hole_fp)
+                elif self._hole_empty and self._changed(fp, self._hole_fp):
+                    # Cards dealt into an empty hole region; only a new hand
+                    # if something from the last one is still held
+                    new_hand = any(c is not None for c in self.hand + self.board)
+                    
+            for i, board_fp in enumerate(board_fps):
+                if board_fp is None or self._board_fp[i] is None:
+                    continue
+                if self.board[i] is not None and self._changed(board_fp, self._board_fp[i]):
+                    new_hand = True
+                    
+            if new_hand:
+                self.hands_seen += 1
+                self.reset()
+                
+            # Follow the pixels of unlocked slots; locked slots keep the
+            # fingerprint of the frame they were locked on
+            if fp is not None and (new_hand or not all(c is not None for c in self.hand)):
+                self._hole_fp = fp
+            for i, board_fp in enumerate(board_fps):
+                if board_fp is not None and self.board[i] is None:
+                    self._board_fp[i] = board_fp
+            return new_hand
+
+    def slots_to_read(self):
+        """Returns (hand slot indices, board slot indices) that still need recognition."""
+        with self._lock:
+            hand = [i for i, c in enumerate(self.hand) if c is None]
+            following = self.STREETS[min(self.STREETS.index(self.street) + 1, len(self.STREETS) - 1)]
+            slots = self.NEXT_SLOTS[self.street] + self.NEXT_SLOTS[following]
+            board = [i for i in slots if self.board[i] is None]
+            return hand, board
+
+    def update(self, hand_reads, board_reads):
+        """
+        Feeds new reads ({slot index: card or 'NoCard'}), locks confirmed cards
+        and advances the street. Returns (hand, board) lists for the CV state.
+        """
+        with self._lock:
+            current_hand = self._merge("hand", self.hand, hand_reads)
+            current_board = self._merge("board", self.board, board_reads)
+            self._hole_empty = all(c is None for c in self.hand) and all(
+                read == "NoCard" for read in hand_reads.values())
+            
+            while self.NEXT_SLOTS[self.street] and all(
+                    self.board[i] is not None for i in self.NEXT_SLOTS[self.street]):
+                self.street = self.STREETS[self.STREETS.index(self.street) + 1]
+                
+            return current_hand, current_board
+
+    def end_hand(self):
+        """Marks the hand as finished (cards stay locked until the next hand is detected)."""
+        with self._lock:
+            self.street = "showdown"
+
+    def _merge(self, name, locked, reads):
+        current = []
+        for i, card in enumerate(locked):
+            if card is not None:
+                current.append(card)
+                continue
+            read = reads.get(i, "NoCard")
+            current.append(read)
+            if read == "NoCard":
+                self._pending.pop((name, i), None)
+                continue
+                
+            last, count = self._pending.get((name, i), (None, 0))
+            count = count + 1 if read == last else 1
+            if count >= self.confirm_frames:
+                locked[i] = read
+                self._pending.pop((name, i), None)
+            else:
+                self._pending[(name, i)] = (read, count)
+        return current
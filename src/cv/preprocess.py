@@ -0,0 +1,92 @@
+import cv2
+import numpy as np
+from .capture import RegionFrame
+
+class FramePreprocessor:
+    """
+    One preprocessing stage per frame.
+    Converts the captured frame (full image or RegionFrame) to grayscale once,
+    plus optional binarized and downscaled planes, into buffers reused across
+    frames. Detectors then work on views of these planes instead of converting
+    every crop themselves. For a full image, passing the capture boxes limits
+    the work to those boxes instead of the whole monitor.
+    """
+    def __init__(self, binarize=False, binary_threshold=None, downscale=None):
+        # binarize: also produce a 'binary' plane (Otsu unless binary_threshold is given)
+        # downscale: also produce a 'small' plane reduced by this factor (e.g. 2)
+        self.binarize = binarize
+        self.binary_threshold = binary_threshold
+        self.downscale = downscale
+        self._buffers = {}
+
+    def process(self, frame, boxes=None):
+        """
+        Returns a dict of planes with the same layout as `frame`:
+        'gray' always, 'binary' and 'small' if configured.
+        boxes: for a full image, only convert these boxes; the planes are
+        then RegionFrames over `boxes`, as for a region capture.
+        """
+        if boxes is not None and not isinstance(frame, RegionFrame):
+            planes = {"gray": self._gray_boxes(frame, boxes)}
+        else:
+            planes = {"gray": self._map(frame, "gray", self._to_gray)}
+        if self.binarize:
+            planes["binary"] = self._map(planes["gray"], "binary", self._to_binary)
+        if self.downscale:
+            # Downscaled planes change shape, so they are plain arrays per box
+            if isinstance(planes["gray"], RegionFrame):
+                planes["small"] = [self._to_small(p) for p in planes["gray"].planes]
+            else:
+                planes["small"] = self._to_small(planes["gray"])
+        return planes
+
+    def _map(self, frame, name, fn):
+        if isinstance(frame, RegionFrame):
+            out = self._buffers.get(name)
+            if not isinstance(out, RegionFrame) or out.boxes is not frame.boxes:
+                out = RegionFrame(frame.boxes, channels=1)
+                self._buffers[name] = out
+            for src, dst in zip(frame.planes, out.planes):
+                fn(src, dst)
+            return out
+            
+        out = self._buffers.get(name)
+        if not isinstance(out, np.ndarray) or out.shape != frame.shape[:2]:
+            out = np.empty(frame.shape[:2], dtype=np.uint8)
+            self._buffers[name] = out
+        fn(frame, out)
+        return out
+
+    def _gray_boxes(self, image, boxes):
+        out = self._buffers.get("gray")
+        if not isinstance(out, RegionFrame) or out.boxes is not boxes:
+            out = RegionFrame(boxes, channels=1)
+            self._buffers["gray"] = out
+        for box, dst in zip(boxes, out.planes):
+            t, l = box["top"], box["left"]
+            top, left = max(t, 0), max(l, 0)
+            src = image[top:t + box["height"], left:l + box["width"]]
+            h, w = src.shape[:2]
+            if (h, w) != dst.shape:
+                # Box runs past the image edge: keep the crop size, pad with black
+                dst[:] = 0
+            if h and w:
+                self._to_gray(src, dst[top - t:top - t + h, left - l:left - l + w])
+        return out
+
+    def _to_gray(self, src, dst):
+        if src.ndim == 2:
+            np.copyto(dst, src)
+        else:
+            cv2.cvtColor(src, cv2.COLOR_BGR2GRAY, dst=dst)
+
+    def _to_binary(self, src, dst):
+        if self.binary_threshold is None:
+            cv2.threshold(src, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=dst)
+        else:
+            cv2.threshold(src, self.binary_threshold, 255, cv2.THRESH_BINARY, dst=dst)
+
+    def _to_small(self, gray):
+        h, w = gray.shape[:2]
+        size = (max(1, w // self.downscale), max(1, h // self.downscale))
+        return cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
@@ -0,0 +1,192 @@
+import cv2
+import numpy as np
+from collections import namedtuple
+
+# name: best template, score: its TM_CCOEFF_NORMED score,
+# margin: lead over the runner-up (score itself if there is only one candidate),
+# loc: top-left (x, y) of the match when the matcher tracks it
+MatchResult = namedtuple("MatchResult", ["name", "score", "margin", "loc"], defaults=(None,))
+
+def normalize_template(template):
+    """Returns the template as a flat float32 vector with zero mean and unit norm."""
+    vec = template.astype(np.float32).ravel()
+    vec -= vec.mean()
+    norm = np.linalg.norm(vec)
+    if norm > 0:
+        vec /= norm
+    return vec
+
+class BatchMatcher:
+    """
+    Scores an image against a whole template set in one batched operation.
+    Templates are normalized once and packed per shape into an (N, h*w) matrix.
+    Because the templates are zero-mean, TM_CCOEFF_NORMED at every position
+    reduces to a matrix product of the raw windows with that matrix, divided
+    by each window's standard deviation (taken from integral images).
+    """
+    def __init__(self, templates, chunk_size=4096, normalized=None):
+        # templates: dict name -> grayscale uint8 image
+        # chunk_size: max number of window positions multiplied at once
+        # normalized: optional dict name -> precomputed normalize_template() vector
+        self.chunk_size = chunk_size
+        self.groups = []
+
+        by_shape = {}
+        for name, template in templates.items():
+            if template is None:
+                continue
+            by_shape.setdefault(template.shape[:2], []).append(name)
+
+        for shape, names in by_shape.items():
+            if normalized is not None and all(n in normalized for n in names):
+                matrix = np.stack([normalized[n] for n in names])
+            else:
+                matrix = np.stack([normalize_template(templates[n]) for n in names])
+            self.groups.append((shape, names, matrix))
+
+    def __len__(self):
+        return sum(len(names) for _, names, _ in self.groups)
+
+    def scores(self, gray):
+        """Returns {name: best score over all positions} for every template that fits."""
+        image = gray.astype(np.float32)
+        H, W = image.shape[:2]
+        sums, sq_sums = cv2.integral2(image, sdepth=cv2.CV_64F)
+
+        results = {}
+        for (h, w), names, matrix in self.groups:
+            if h > H or w > W:
+                continue
+
+            n = h * w
+            s = sums[h:, w:] - sums[:-h, w:] - sums[h:, :-w] + sums[:-h, :-w]
+            sq = sq_sums[h:, w:] - sq_sums[:-h, w:] - sq_sums[h:, :-w] + sq_sums[:-h, :-w]
+            std = np.sqrt(np.maximum(sq - s * s / n, 0))
+
+            # (H-h+1, W-w+1, h, w) view; rows are copied out one chunk at a time
+            windows = np.lib.stride_tricks.sliding_window_view(image, (h, w))
+            rows = max(1, self.chunk_size // windows.shape[1])
+
+            best = np.full(len(names), -1.0, dtype=np.float32)
+            for start in range(0, windows.shape[0], rows):
+                block = windows[start:start + rows].reshape(-1, n)
+                block_std = std[start:start + rows].ravel().astype(np.float32)
+                corr = block @ matrix.T
+                valid = block_std > 1e-6
+                corr[valid] /= block_std[valid, None]
+                corr[~valid] = 0
+                np.maximum(best, corr.max(axis=0), out=best)
+
+            results.update(zip(names, best.tolist()))
+        return results
+
+    def match(self, gray):
+        """Returns the MatchResult of the best template, or None if no template fits."""
+        scores = self.scores(gray)
+        if not scores:
+            return None
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        name, score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        return MatchResult(name, score, score - runner_up)
+
+class PyramidMatcher:
+    """
+    Coarse-to-fine template matching with early exit.
+    Every template is scored on a downscaled copy of the image first; every
+    candidate within `band` of the best coarse score is refined at full
+    resolution, in a small window around its coarse peak, best first.
+    Refinement stops once a score beats the threshold by `exit_margin` and
+    leads the next candidate's coarse score by `exit_lead` (cards of the
+    same rank and another suit score close to the right one).
+    """
+    def __init__(self, templates, levels=2, band=0.15, exit_margin=0.1, exit_lead=0.1, min_size=8,
+                 pyramids=None):
+        # levels: number of pyrDown steps for the coarse pass
+        # band: coarse candidates scoring at least best - band are refined
+        # min_size: templates are never shrunk below this many pixels per side
+        # pyramids: optional dict name -> precomputed [full, pyrDown, ...] levels
+        self.levels = levels
+        self.band = band
+        self.exit_margin = exit_margin
+        self.exit_lead = exit_lead
+        self.min_size = min_size
+        self.templates = {}
+        for name, template in templates.items():
+            if template is None:
+                continue
+            precomputed = pyramids.get(name, []) if pyramids is not None else []
+            pyramid = [template]
+            while (len(pyramid) <= levels and
+                   min(pyramid[-1].shape[:2]) // 2 >= min_size):
+                if len(precomputed) > len(pyramid):
+                    pyramid.append(precomputed[len(pyramid)])
+                else:
+                    pyramid.append(cv2.pyrDown(pyramid[-1]))
+            self.templates[name] = pyramid
+
+    def match(self, gray, threshold=0.8, names=None):
+        """
+        Returns the MatchResult (with loc) of the best template, or None if no template fits.
+        names: optional subset of template names to consider.
+        """
+        names = names if names is not None else list(self.templates)
+        
+        image_pyramid = [gray]
+        for _ in range(self.levels):
+            image_pyramid.append(cv2.pyrDown(image_pyramid[-1]))
+
+        # 1. Coarse pass
+        coarse = []
+        for name in names:
+            pyramid = self.templates.get(name)
+            if pyramid is None:
+                continue
+            template = pyramid[0]
+            if template.shape[0] > gray.shape[0] or template.shape[1] > gray.shape[1]:
+                continue
+                
+            level = len(pyramid) - 1
+            image = image_pyramid[level]
+            small = pyramid[level]
+            while level > 0 and (small.shape[0] > image.shape[0] or small.shape[1] > image.shape[1]):
+                level -= 1
+                image, small = image_pyramid[level], pyramid[level]
+                
+            res = cv2.matchTemplate(image, small, cv2.TM_CCOEFF_NORMED)
+            _, max_val, _, max_loc = cv2.minMaxLoc(res)
+            coarse.append((max_val, name, level, max_loc))
+
+        if not coarse:
+            return None
+        coarse.sort(key=lambda c: c[0], reverse=True)
+
+        # 2. Refine the candidates in the band at full resolution around their coarse peak
+        candidates = [c for c in coarse if c[0] >= coarse[0][0] - self.band]
+        refined = []
+        for i, (coarse_val, name, level, (cx, cy)) in enumerate(candidates):
+            template = self.templates[name][0]
+            th, tw = template.shape[:2]
+            scale = 2 ** level
+            pad = scale + 2
+            x0 = max(0, cx * scale - pad)
+            y0 = max(0, cy * scale - pad)
+            x1 = min(gray.shape[1], cx * scale + tw + pad)
+            y1 = min(gray.shape[0], cy * scale + th + pad)
+            
+            res = cv2.matchTemplate(gray[y0:y1, x0:x1], template, cv2.TM_CCOEFF_NORMED)
+            _, max_val, _, (mx, my) = cv2.minMaxLoc(res)
+            refined.append((max_val, name, (x0 + mx, y0 + my)))
+            
+            next_val = candidates[i + 1][0] if i + 1 < len(candidates) else -1.0
+            if max_val >= threshold + self.exit_margin and max_val - next_val >= self.exit_lead:
+                break
+
+        refined.sort(key=lambda r: r[0], reverse=True)
+        score, name, loc = refined[0]
+        if len(refined) > 1:
+            runner_up = refined[1][0]
+        else:
+            runner_up = coarse[1][0] if len(coarse) > 1 else 0.0
+        return MatchResult(name, score, score - runner_up, loc)
@@ -0,0 +1,76 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import cv2
+import numpy as np
+
+class RecognitionCache:
+    """
+    Bounded LRU cache of recognition results keyed by a perceptual hash.
+    The same card art or number rendered by the same client hashes to the
+    same key in any slot and on any table, so one instance can be shared by
+    every detector. Results below min_confidence are never stored.
+
+    pHash only suits crops whose classes look very different (cards): on wide
+    number crops it maps many values to one key, so numbers use key(...,
+    exact=True), a digest of the binarized crop.
+    """
+    MISS = object()
+
+    def __init__(self, max_size=4096, min_confidence=0.9, hash_size=16):
+        # hash_size: side of the low-frequency DCT block; the hash has hash_size**2 bits
+        self.max_size = max_size
+        self.min_confidence = min_confidence
+        self.hash_size = hash_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def phash(self, gray):
+        """DCT perceptual hash of a grayscale crop, as bytes."""
+        side = self.hash_size * 4
+        small = cv2.resize(gray, (side, side), interpolation=cv2.INTER_AREA).astype(np.float32)
+        low = cv2.dct(small)[:self.hash_size, :self.hash_size].ravel()
+        bits = low > np.median(low[1:]) # Skip the DC term
+        return np.packbits(bits).tobytes()
+
+    def exact_hash(self, gray):
+        """Digest of a grayscale crop binarized with Otsu's threshold, as bytes."""
+        _, binary = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        return hashlib.blake2b(np.packbits(binary).tobytes(), digest_size=16).digest()
+
+    def key(self, gray, kind, exact=False):
+        """Cache key for a crop; `kind` keeps e.g. card and number results apart."""
+        return (kind, gray.shape[:2], self.exact_hash(gray) if exact else self.phash(gray))
+
+    def get(self, key):
+        """Returns the cached result or RecognitionCache.MISS."""
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            return self.MISS
+
+    def put(self, key, result, confidence):
+        """Stores a result unless its confidence is below min_confidence."""
+        with self._lock:
+            if confidence < self.min_confidence:
+                self.rejected += 1
+                return
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
@@ -0,0 +1,65 @@
+import threading
+import cv2
+import numpy as np
+
+class RegionCache:
+    """
+    Per-region change detection.
+    Keeps a downsampled fingerprint of each region together with the last
+    detection result, and reuses that result while the pixels stay the same.
+    The fingerprint grid scales with the region (one cell per `cell` x `cell`
+    pixels), so a changed thin digit in a wide stack or pot region still
+    moves its cells well past the tolerance.
+    """
+    def __init__(self, cell=4, tolerance=8, size=None):
+        # cell: side in pixels of the area averaged into one fingerprint cell
+        # tolerance: max per-cell absolute difference still treated as unchanged
+        # size: optional fixed (width, height) of the fingerprint instead of cell
+        self.cell = cell
+        self.size = size
+        self.tolerance = tolerance
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        # Regions may be read from several worker threads at once
+        self._lock = threading.Lock()
+
+    def fingerprint(self, image):
+        """Downsamples the region to an int16 grid (area averaging)."""
+        h, w = image.shape[:2]
+        size = self.size or (max(1, w // self.cell), max(1, h // self.cell))
+        small = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        return small.astype(np.int16)
+
+    def get(self, key, image, compute):
+        """
+        Returns the cached result for `key` if `image` is unchanged,
+        otherwise calls compute(image) and caches its result.
+        """
+        if image is None or image.size == 0:
+            return compute(image)
+
+        fp = self.fingerprint(image)
+        with self._lock:
+            entry = self.entries.get(key)
+        if entry is not None:
+            last_fp, result = entry
+            if last_fp.shape == fp.shape and np.abs(fp - last_fp).max() <= self.tolerance:
+                with self._lock:
+                    self.hits += 1
+                return result
+
+        result = compute(image)
+        with self._lock:
+            self.misses += 1
+            self.entries[key] = (fp, result)
+        return result
+
+    def invalidate(self, keys=None):
+        """Drops cached results (all of them, or only the given keys), e.g. at hand boundaries."""
+        with self._lock:
+            if keys is None:
+                self.entries.clear()
+                return
+            for key in keys:
+                self.entries.pop(key, None)
@@ -0,0 +1,69 @@
+import os
+import cv2
+import numpy as np
+
+class SeatClassifier:
+    """
+    Classifies all seats of a table in one vectorized step.
+    Each seat crop becomes a compact feature vector (a downsampled,
+    normalized intensity image plus an intensity histogram); the status is
+    the nearest centroid of the reference samples collected per status in
+    samples_dir/<status>/*.png (see tools/collect_templates.py).
+    """
+    STATUSES = ("active", "folded", "empty", "sitting_out", "all_in")
+
+    def __init__(self, samples_dir="data/templates/seats", feature_size=(16, 12), hist_bins=16):
+        # feature_size: (w, h) of the downsampled intensity image
+        self.samples_dir = samples_dir
+        self.feature_size = feature_size
+        self.hist_bins = hist_bins
+        self.labels = []
+        self.centroids = None
+        self._load_samples()
+
+    @property
+    def available(self):
+        return self.centroids is not None
+
+    def _load_samples(self):
+        if not os.path.exists(self.samples_dir):
+            return
+        labels, centroids = [], []
+        for status in self.STATUSES:
+            status_dir = os.path.join(self.samples_dir, status)
+            if not os.path.isdir(status_dir):
+                continue
+            samples = [cv2.imread(os.path.join(status_dir, f), 0)
+                       for f in sorted(os.listdir(status_dir)) if f.endswith(".png")]
+            samples = [s for s in samples if s is not None]
+            if samples:
+                labels.append(status)
+                centroids.append(self.features(samples).mean(axis=0))
+        if labels:
+            self.labels = labels
+            self.centroids = np.stack(centroids)
+
+    def features(self, crops):
+        """Returns an (N, D) float32 feature matrix for N seat crops (gray or BGR)."""
+        w, h = self.feature_size
+        n = len(crops)
+        small = np.empty((n, h, w), dtype=np.float32)
+        hists = np.empty((n, self.hist_bins), dtype=np.float32)
+        for i, crop in enumerate(crops):
+            gray = crop if crop.ndim == 2 else cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+            small[i] = cv2.resize(gray, (w, h), interpolation=cv2.INTER_AREA)
+            hists[i] = cv2.calcHist([gray], [0], None, [self.hist_bins], [0, 256]).ravel()
+            
+        small = small.reshape(n, -1)
+        small -= small.mean(axis=1, keepdims=True)
+        small /= np.linalg.norm(small, axis=1, keepdims=True) + 1e-6
+        hists /= hists.sum(axis=1, keepdims=True) + 1e-6
+        return np.hstack([small, hists])
+
+    def classify(self, crops):
+        """Returns one status per crop (nearest centroid, all seats at once)."""
+        x = self.features(crops)
+        # Squared distances to every centroid in one matrix step
+        d = ((x ** 2).sum(axis=1, keepdims=True) - 2 * x @ self.centroids.T
+             + (self.centroids ** 2).sum(axis=1))
+        return [self.labels[i] for i in d.argmin(axis=1)]
@@ -1,12 +1,31 @@
 import numpy as np
+from ..rl.equity import EquityEstimator
+from ..rl.equity_tables import find_tables
 
 class StateBuilder:
-    def __init__(self, initial_stack=100.0):
+    def __init__(self, initial_stack=100.0, include_equity=False, equity_estimator=None, equity_tables=None):
         self.initial_stack = initial_stack
+        # Optional "equity" component, matching PokerEnv(include_equity=True);
+        # preflop and flop spots come straight from the tables when given
+        self.include_equity = include_equity
+        self.equity_estimator = None
+        if include_equity:
+            self.equity_estimator = equity_estimator or EquityEstimator(
+                num_samples=1000, time_budget=0.005, tables=find_tables(equity_tables))
         
         # Card encoding maps (must match PokerEnv)
         self.suits = {'S': 0, 'H': 1, 'D': 2, 'C': 3}
         self.ranks = {'2': 0, '3': 1, '4': 2, '5': 3, '6': 4, '7': 5, '8': 6, '9': 7, 'T': 8, 'J': 9, 'Q': 10, 'K': 11, 'A': 12}
+        
+        # Precomputed card string -> index table (any case), used by the batch encoder
+        self.card_lut = {"NoCard": -1}
+        for r, rank in self.ranks.items():
+            for s, suit in self.suits.items():
+                for card in (r + s, r + s.lower(), r.lower() + s, r.lower() + s.lower()):
+                    self.card_lut[card] = rank * 4 + suit
+        self.status_lut = {"active": (1.0, 0.0), "all_in": (1.0, 0.0), "folded": (0.0, 1.0)}
+        self._batch = None
+        self._batch_size = 0
 
     def build_observation(self, cv_state):
         """
@@ -52,7 +71,7 @@ class StateBuilder:
             
             status = p_data.get("status", "active")
             is_folded = 1.0 if status == "folded" else 0.0
-            is_active = 1.0 if status == "active" else 0.0
+            is_active = 1.0 if status in ("active", "all_in") else 0.0
             
             stack = p_data.get("stack", 0.0) / self.initial_stack
             bet = p_data.get("bet", 0.0) / self.initial_stack
@@ -81,7 +100,7 @@ class StateBuilder:
         # For now, assume [Fold, Call, Raise] are all valid if active.
         legal_mask = np.array([1, 1, 1], dtype=np.int32)
         
-        return {
+        obs = {
             "hand": np.array(hand_cards, dtype=np.int32),
             "board": np.array(board_cards, dtype=np.int32),
             "pot": np.array([pot], dtype=np.float32),
@@ -92,6 +111,91 @@ class StateBuilder:
             "street": np.array([street], dtype=np.int32),
             "legal_actions": legal_mask
         }
+        
+        # 9. Equity against the other seats still in the hand
+        if self.include_equity:
+            opponents = int(players_info[:, 0].sum() - players_info[hero_idx, 0])
+            obs["equity"] = self.equity_estimator.equity_batch(obs["hand"][None], obs["board"][None], [opponents])
+        return obs
+
+    def _allocate_batch(self, n):
+        """Contiguous (N, ...) observation arrays, grown on demand and reused between calls."""
+        if self._batch is None or self._batch_size < n:
+            self._batch = {
+                "hand": np.empty((n, 2), dtype=np.int32),
+                "board": np.empty((n, 5), dtype=np.int32),
+                "pot": np.empty((n, 1), dtype=np.float32),
+                "my_stack": np.empty((n, 1), dtype=np.float32),
+                "my_bet": np.empty((n, 1), dtype=np.float32),
+                "players": np.empty((n, 6, 4), dtype=np.float32),
+                "position": np.empty((n, 1), dtype=np.int32),
+                "street": np.empty((n, 1), dtype=np.int32),
+                "legal_actions": np.empty((n, 3), dtype=np.int32),
+            }
+            if self.include_equity:
+                self._batch["equity"] = np.empty((n, 1), dtype=np.float32)
+            self._batch_size = n
+        return {k: v[:n] for k, v in self._batch.items()}
+
+    def build_observations_batch(self, cv_states):
+        """
+        Encodes N raw CV states at once into (N, ...) arrays with the same
+        layout as build_observation, ready for a single batched model.predict.
+        The arrays are reused by the next call; copy them to keep them.
+        """
+        n = len(cv_states)
+        obs = self._allocate_batch(n)
+        hand, board, players = obs["hand"], obs["board"], obs["players"]
+        hand.fill(-1)
+        board.fill(-1)
+        players.fill(0.0)
+        num_board = np.zeros(n, dtype=np.int32)
+        
+        # Raw numbers first; normalization is done once for the whole batch below
+        pot = obs["pot"][:, 0]
+        my_stack = obs["my_stack"][:, 0]
+        my_bet = obs["my_bet"][:, 0]
+        hero_idx = 4
+        lut = self.card_lut
+        player_rows = []
+        
+        for i, cv_state in enumerate(cv_states):
+            for j, c in enumerate(cv_state.get("hand", [])[:2]):
+                hand[i, j] = lut.get(c if isinstance(c, str) else "".join(c), -1)
+            for j, c in enumerate(cv_state.get("board", [])[:5]):
+                board[i, j] = lut.get(c if isinstance(c, str) else "".join(c), -1)
+                if c != "NoCard":
+                    num_board[i] += 1
+                    
+            pot[i] = cv_state.get("pot", 0.0)
+            seats = cv_state.get("players", [])
+            hero_data = seats[hero_idx] if len(seats) > hero_idx else {}
+            my_stack[i] = hero_data.get("stack", 0.0)
+            my_bet[i] = hero_data.get("bet", 0.0)
+            
+            for k, p_data in enumerate(seats[:6]):
+                is_active, is_folded = self.status_lut.get(p_data.get("status", "active"), (0.0, 0.0))
+                player_rows.append((i, k, is_active, p_data.get("stack", 0.0), p_data.get("bet", 0.0), is_folded))
+                
+        # Scatter all seat rows in one step
+        if player_rows:
+            rows = np.array(player_rows, dtype=np.float32)
+            players[rows[:, 0].astype(np.intp), rows[:, 1].astype(np.intp)] = rows[:, 2:]
+            
+        obs["pot"] /= self.initial_stack
+        obs["my_stack"] /= self.initial_stack
+        obs["my_bet"] /= self.initial_stack
+        players[:, :, 1:3] /= self.initial_stack
+        
+        obs["position"].fill(hero_idx)
+        # Street from number of board cards: <3 preflop, 3 flop, 4 turn, 5 river
+        obs["street"][:, 0] = np.clip(num_board - 2, 0, 3)
+        obs["legal_actions"].fill(1)
+        
+        if self.include_equity:
+            opponents = players[:, :, 0].sum(1) - players[:, hero_idx, 0]
+            obs["equity"][:, 0] = self.equity_estimator.equity_batch(hand, board, opponents.astype(np.int64))
+        return obs
 
     def _encode_card(self, card_str):
         if not card_str or card_str == "NoCard": return -1
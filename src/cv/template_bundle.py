@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import cv2
+import numpy as np
+from .recognition import normalize_template
+
+BUNDLE_VERSION = 2
+BUNDLE_MAGIC = b"PVTMPLBD"
+BUNDLE_NAME = "templates.bundle"
+
+class TemplateBundle:
+    """
+    Templates compiled into one file: grayscale arrays plus everything the
+    matchers would otherwise recompute (normalized vectors, means, norms and
+    pyramid levels). Names of templates in sub-directories keep their
+    relative path, e.g. 'ranks/A'.
+    """
+    def __init__(self, templates, normalized, means, norms, pyramids, metadata):
+        self.templates = templates
+        self.normalized = normalized
+        self.means = means
+        self.norms = norms
+        self.pyramids = pyramids
+        self.metadata = metadata
+
+    def subset(self, prefix=""):
+        """Returns the templates under `prefix` (a sub-directory) with the prefix stripped."""
+        if not prefix:
+            keep = {n: n for n in self.templates if "/" not in n}
+        else:
+            start = prefix.rstrip("/") + "/"
+            keep = {n: n[len(start):] for n in self.templates
+                    if n.startswith(start) and "/" not in n[len(start):]}
+                    
+        def pick(d):
+            return {new: d[old] for old, new in keep.items()}
+        return TemplateBundle(pick(self.templates), pick(self.normalized), pick(self.means),
+                              pick(self.norms), pick(self.pyramids), self.metadata)
+
+def template_sources(templates_dir):
+    """
+    Every .png under templates_dir as {name: [mtime_ns, size]}, names
+    relative to templates_dir without the extension ('ranks/A').
+    """
+    sources = {}
+    for root, _, files in os.walk(templates_dir):
+        for filename in files:
+            if filename.endswith(".png"):
+                path = os.path.join(root, filename)
+                rel = os.path.relpath(path, templates_dir)
+                stat = os.stat(path)
+                sources[rel[:-len(".png")].replace(os.sep, "/")] = [stat.st_mtime_ns, stat.st_size]
+    return sources
+
+def compile_bundle(templates_dir, out_path=None, pyramid_levels=2):
+    """
+    Packs every .png under templates_dir into a single versioned bundle file.
+    Templates of the same shape are stacked into one array per plane, and
+    the file is a JSON header followed by the raw arrays, so loading is one
+    header read and a memory map. Returns the bundle path.
+    """
+    out_path = out_path or os.path.join(templates_dir, BUNDLE_NAME)
+    
+    sources = template_sources(templates_dir)
+    names = sorted(sources)
+    grays = [cv2.imread(os.path.join(templates_dir, name + ".png"), 0) for name in names]
+    
+    shapes = sorted(set(gray.shape for gray in grays))
+    groups = [shapes.index(gray.shape) for gray in grays]
+    stats = np.zeros((len(names), 2), dtype=np.float32) # mean, norm of each template
+    arrays = {}
+    for g in range(len(shapes)):
+        members = [i for i, group in enumerate(groups) if group == g]
+        stack = np.stack([grays[i] for i in members])
+        arrays[f"gray_{g}"] = stack
+        arrays[f"norm_{g}"] = np.stack([normalize_template(gray) for gray in stack])
+        vecs = stack.reshape(len(stack), -1).astype(np.float32)
+        stats[members, 0] = vecs.mean(1)
+        stats[members, 1] = np.linalg.norm(vecs - vecs.mean(1, keepdims=True), axis=1)
+        
+        level = stack
+        for l in range(1, pyramid_levels + 1):
+            level = np.stack([cv2.pyrDown(img) for img in level])
+            arrays[f"pyr_{g}_{l}"] = level
+    arrays["stats"] = stats
+
+    # Array offsets are relative to the 64-byte aligned start of the data
+    layout, offset = {}, 0
+    for key, array in arrays.items():
+        layout[key] = [offset, array.dtype.str, list(array.shape)]
+        offset = (offset + array.nbytes + 63) // 64 * 64
+    metadata = {
+        "source": os.path.abspath(templates_dir),
+        "created": time.time(),
+        "pyramid_levels": pyramid_levels,
+        # Modification time and size of every source PNG, to detect edits
+        "sources": sources,
+    }
+    header = json.dumps({"metadata": metadata, "names": names, "groups": groups,
+                         "num_groups": len(shapes), "arrays": layout}).encode()
+    data_start = (16 + len(header) + 63) // 64 * 64
+    
+    with open(out_path, "wb") as f:
+        f.write(BUNDLE_MAGIC)
+        f.write(np.array([BUNDLE_VERSION, len(header)], dtype="<u4").tobytes())
+        f.write(header)
+        for key, array in arrays.items():
+            f.write(b"\0" * (data_start + layout[key][0] - f.tell()))
+            f.write(np.ascontiguousarray(array).tobytes())
+    return out_path
+
+def load_bundle(path):
+    """
+    Maps a bundle written by compile_bundle. Raises ValueError on a bad
+    file or a version mismatch.
+    """
+    with open(path, "rb") as f:
+        magic = f.read(8)
+        fields = np.frombuffer(f.read(8), dtype="<u4")
+        if magic != BUNDLE_MAGIC or len(fields) != 2:
+            raise ValueError(f"{path} is not a template bundle")
+        version, header_size = int(fields[0]), int(fields[1])
+        if version != BUNDLE_VERSION:
+            raise ValueError(f"Template bundle {path} has version {version}, expected {BUNDLE_VERSION}")
+        header = json.loads(f.read(header_size))
+        
+    data_start = (16 + header_size + 63) // 64 * 64
+    raw = np.memmap(path, dtype=np.uint8, mode="r")
+    arrays = {}
+    for key, (offset, dtype, shape) in header["arrays"].items():
+        dtype = np.dtype(dtype)
+        begin = data_start + offset
+        arrays[key] = raw[begin:begin + dtype.itemsize * int(np.prod(shape))].view(dtype).reshape(shape)
+        
+    metadata = header["metadata"]
+    levels = metadata["pyramid_levels"]
+    names, groups = header["names"], header["groups"]
+    stats = arrays["stats"].tolist()
+    counts = [0] * header["num_groups"]
+    templates, normalized, means, norms, pyramids = {}, {}, {}, {}, {}
+    for i, (name, g) in enumerate(zip(names, groups)):
+        j = counts[g]
+        counts[g] += 1
+        templates[name] = arrays[f"gray_{g}"][j]
+        normalized[name] = arrays[f"norm_{g}"][j]
+        means[name], norms[name] = stats[i]
+        pyramids[name] = [templates[name]] + [arrays[f"pyr_{g}_{l}"][j] for l in range(1, levels + 1)
+                                              if f"pyr_{g}_{l}" in arrays]
+    return TemplateBundle(templates, normalized, means, norms, pyramids, metadata)
+
+def is_stale(bundle, templates_dir):
+    """True if PNGs under templates_dir were added, removed or rewritten since the bundle was compiled."""
+    return bundle.metadata.get("sources") != template_sources(templates_dir)
+
+def find_bundle(templates_dir):
+    """
+    Returns the loaded bundle for a template directory, or None if there is
+    none or it is stale (see is_stale); the PNGs are loaded instead then.
+    """
+    if templates_dir.endswith(".bundle"):
+        return load_bundle(templates_dir) if os.path.exists(templates_dir) else None
+        
+    path = os.path.join(templates_dir, BUNDLE_NAME)
+    if not os.path.exists(path):
+        return None
+    try:
+        bundle = load_bundle(path)
+    except ValueError:
+        return None # Not a bundle or another version: the PNGs are used until it is recompiled
+    if is_stale(bundle, templates_dir):
+        return None
+    return bundle
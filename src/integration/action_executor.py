@@ -3,13 +3,15 @@ import time
 import random
 
 class ActionExecutor:
-    def __init__(self):
+    def __init__(self, offset=(0, 0)):
         # Button coordinates (x, y)
         # These need to be calibrated by the user.
+        # offset: (dx, dy) of the table window, for tables not at the default position
+        dx, dy = offset
         self.buttons = {
-            0: (1000, 900), # Fold
-            1: (1150, 900), # Check/Call
-            2: (1300, 900), # Raise
+            0: (1000 + dx, 900 + dy), # Fold
+            1: (1150 + dx, 900 + dy), # Check/Call
+            2: (1300 + dx, 900 + dy), # Raise
         }
         
         # Safety: Fail-safe corner
@@ -0,0 +1,134 @@
+import copy
+import heapq
+import time
+from src.cv.cv_module import ComputerVision
+from src.cv.capture import ScreenCapture
+from src.cv.detection import CardDetector, StateDetector
+from src.cv.hand_tracker import HandTracker
+from src.cv.recognition_cache import RecognitionCache
+from src.integration.action_executor import ActionExecutor
+
+def offset_regions(regions, dx, dy):
+    """Returns a copy of a region layout shifted by (dx, dy)."""
+    shifted = copy.deepcopy(regions)
+    
+    def shift(region):
+        region["left"] += dx
+        region["top"] += dy
+        
+    for value in shifted.values():
+        if isinstance(value, dict):
+            shift(value)
+        else:
+            for region in value:
+                shift(region)
+    return shifted
+
+class TableSession:
+    """
+    One table window: its own region layout, hand tracker and action executor.
+    Tracks when the hero's turn started so the scheduler can estimate the
+    time left on the action clock.
+    """
+    def __init__(self, name, cv, executor, action_clock=15.0):
+        # action_clock: seconds the client gives the hero to act
+        self.name = name
+        self.cv = cv
+        self.executor = executor
+        self.action_clock = action_clock
+        self.turn_started = None
+        self.handled = False # Already acted on the current turn
+
+    def poll(self):
+        """Checks the cheap turn trigger. Returns True while the hero is to act and not yet handled."""
+        if not self.cv.hero_to_act():
+            self.turn_started = None
+            self.handled = False
+            return False
+        if self.turn_started is None:
+            self.turn_started = time.monotonic()
+        return not self.handled
+
+    def time_remaining(self):
+        """Seconds left to act, from the timer bar if calibrated, else from when the turn started."""
+        fraction = self.cv.turn_time_left()
+        if fraction is not None:
+            return fraction * self.action_clock
+        waited = time.monotonic() - (self.turn_started or time.monotonic())
+        return self.action_clock - waited
+
+class MultiTableRunner:
+    """
+    Drives several tables from one process.
+    All tables share one screen capture, one pair of detectors (and their
+    templates and recognition cache) and one loaded policy. Each round the
+    cheap turn trigger is polled on every table, and recognition and
+    inference go to the tables where the hero is to act, least time left first.
+    """
+    def __init__(self, tables, builder, model, act=False, poll_interval=0.01):
+        self.tables = tables
+        self.builder = builder
+        self.model = model
+        self.act = act
+        self.poll_interval = poll_interval
+
+    @classmethod
+    def from_offsets(cls, offsets, builder, model, act=False, capture_backend=None,
+                     cache_size=4096, **cv_kwargs):
+        """
+        Builds one TableSession per window offset (dx, dy) from the default
+        layout, sharing capture, detectors and cache between them.
+        A recognition_cache in cv_kwargs is used instead of a new one.
+        Every table gets its own HandTracker with confirm_frames=1: get_state
+        runs once per hero turn, so a card is locked on its first read and
+        later turns only read the slots still open.
+        """
+        cache = cv_kwargs.pop("recognition_cache", None) or RecognitionCache(max_size=cache_size)
+        capture = ScreenCapture(capture_backend)
+        card_detector = CardDetector(cache=cache)
+        state_detector = StateDetector(cache=cache)
+        
+        tables = []
+        for i, (dx, dy) in enumerate(offsets):
+            cv = ComputerVision(capture=capture, card_detector=card_detector, state_detector=state_detector,
+                                hand_tracker=HandTracker(confirm_frames=1), **cv_kwargs)
+            cv.regions = offset_regions(cv.regions, dx, dy)
+            tables.append(TableSession(f"table_{i}", cv, ActionExecutor(offset=(dx, dy))))
+        return cls(tables, builder, model, act=act)
+
+    def schedule(self):
+        """Returns the tables where the hero is to act, ordered by time remaining."""
+        heap = []
+        for i, table in enumerate(self.tables):
+            if table.poll():
+                heapq.heappush(heap, (table.time_remaining(), i, table))
+        return [heapq.heappop(heap)[2] for _ in range(len(heap))]
+
+    def handle(self, table):
+        """Full recognition, inference and action for one table."""
+        raw_state = table.cv.get_state()
+        obs = self.builder.build_observation(raw_state)
+        action, _states = self.model.predict(obs, deterministic=True)
+        table.handled = True
+        
+        if self.act:
+            table.executor.execute_action(int(action))
+        else:
+            print(f"[{table.name}] Recommended Action: {action}")
+        return int(action)
+
+    def step(self):
+        """One scheduling round. Returns the number of tables handled."""
+        ready = self.schedule()
+        for table in ready:
+            self.handle(table)
+        return len(ready)
+
+    def run_forever(self):
+        try:
+            while True:
+                if not self.step():
+                    time.sleep(self.poll_interval)
+        finally:
+            for table in self.tables:
+                table.cv.close()
@@ -0,0 +1,285 @@
+import threading
+import time
+import traceback
+from collections import deque, namedtuple
+from src.cv.preprocess import FramePreprocessor
+
+# seq: capture sequence number, timestamp: capture time (time.monotonic()), payload: stage data,
+# turn: number of the hero turn the frame was grabbed on (turn_gate only, else None)
+Stamped = namedtuple("Stamped", ["seq", "timestamp", "payload", "turn"], defaults=[None])
+# A captured frame and the region layout it was grabbed with
+Frame = namedtuple("Frame", ["image", "regions"])
+
+class DropOldestQueue:
+    """
+    Bounded queue that never blocks the producer.
+    When full, the oldest item is dropped (and passed to on_drop) to make room.
+    """
+    def __init__(self, maxsize=1, on_drop=None):
+        self.items = deque()
+        self.maxsize = maxsize
+        self.on_drop = on_drop
+        self.dropped = 0
+        self.cond = threading.Condition()
+
+    def put(self, item):
+        with self.cond:
+            if len(self.items) >= self.maxsize:
+                old = self.items.popleft()
+                self.dropped += 1
+                if self.on_drop is not None:
+                    self.on_drop(old)
+            self.items.append(item)
+            self.cond.notify()
+
+    def get(self, timeout=None):
+        """Returns the oldest item, or None if nothing arrived within timeout."""
+        with self.cond:
+            if not self.items:
+                self.cond.wait(timeout)
+            if not self.items:
+                return None
+            return self.items.popleft()
+
+class AdaptivePoller:
+    """
+    Polling interval that backs off while nothing happens.
+    Each miss multiplies the interval by `backoff` (up to max_interval),
+    a hit resets it to min_interval, and idle() jumps straight to the
+    maximum (e.g. while the hero is folded or between hands).
+    """
+    def __init__(self, min_interval=0.01, max_interval=0.5, backoff=1.5):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = min_interval
+
+    def hit(self):
+        self.interval = self.min_interval
+
+    def miss(self):
+        self.interval = min(self.max_interval, self.interval * self.backoff)
+
+    def idle(self):
+        self.interval = self.max_interval
+
+    def wait(self):
+        time.sleep(self.interval)
+
+class Pipeline:
+    """
+    Pipelined runtime: capture -> detect -> decide -> act.
+    Every stage runs in its own thread(s) and the stages are connected by
+    drop-oldest queues, so a slow stage never builds up a backlog; it just
+    works on the newest data. Frames carry their capture time and anything
+    older than max_frame_age is never acted on.
+    With turn_gate=True the capture stage first polls the cheap hero-to-act
+    trigger and only grabs a full frame when it fires; the trigger is
+    polled at full rate while the hero holds cards and backs off otherwise.
+    Each turn (with turn_gate) or each distinct table state (without) is
+    acted on once. An exception in a stage is printed and the stage keeps
+    running.
+    """
+    def __init__(self, cv, builder, model, executor=None, detection_workers=1,
+                 queue_size=1, max_frame_age=0.25, capture_interval=0.02, act=False,
+                 turn_gate=False, poller=None, retrigger_interval=1.0, hero_seat=4,
+                 calibrator=None, calibration_interval=5.0):
+        # executor: ActionExecutor, only used when act=True (otherwise actions are printed)
+        # capture_interval: minimum seconds between two captures
+        # retrigger_interval: while the trigger stays on, re-run recognition at most this often
+        # hero_seat: seat index of the hero in the CV state (see StateBuilder)
+        # calibrator: optional TableCalibrator, checked every calibration_interval seconds
+        self.cv = cv
+        self.builder = builder
+        self.model = model
+        self.executor = executor
+        self.detection_workers = detection_workers
+        self.max_frame_age = max_frame_age
+        self.capture_interval = capture_interval
+        self.act = act
+        self.turn_gate = turn_gate
+        self.poller = poller or AdaptivePoller()
+        self.retrigger_interval = retrigger_interval
+        self.hero_seat = hero_seat
+        self.hero_folded = False
+        self.calibrator = calibrator
+        self.calibration_interval = calibration_interval
+        self._last_calibration = 0.0
+
+        self.frames = DropOldestQueue(queue_size, on_drop=lambda item: cv.release_frame(item.payload.image))
+        self.states = DropOldestQueue(queue_size)
+        self.actions = DropOldestQueue(1)
+
+        self.stale = 0
+        self.decisions = 0
+        self.errors = 0
+        self._last_seq = -1
+        self._last_decided = None # Turn number or state key of the last decision
+        self._seq_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def is_stale(self, item):
+        return time.monotonic() - item.timestamp > self.max_frame_age
+
+    def start(self):
+        self._stop.clear()
+        self._seq = 0
+        self._turn = 0
+        self._turn_on = False
+        self._last_fired = 0.0
+        targets = [self._capture_loop]
+        targets += [self._detect_loop] * self.detection_workers
+        targets += [self._decide_loop, self._act_loop]
+        for target in targets:
+            thread = threading.Thread(target=self._supervise, args=(target,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _supervise(self, loop):
+        """Runs a stage loop, restarting it after an exception until the pipeline stops."""
+        while not self._stop.is_set():
+            try:
+                loop()
+            except Exception:
+                self.errors += 1
+                print(f"Pipeline stage {loop.__name__} failed, restarting:")
+                traceback.print_exc()
+                time.sleep(0.1)
+
+    def run_forever(self):
+        self.start()
+        try:
+            while not self._stop.is_set():
+                time.sleep(0.5)
+        finally:
+            self.stop()
+
+    def _wait_for_turn(self):
+        """
+        Polls the turn trigger until it fires (True) or the pipeline stops (False).
+        Fires on the rising edge and then at most every retrigger_interval.
+        """
+        while not self._stop.is_set():
+            if self.cv.hero_to_act():
+                self.poller.hit()
+                now = time.monotonic()
+                if not self._turn_on or now - self._last_fired >= self.retrigger_interval:
+                    if not self._turn_on:
+                        self._turn += 1
+                    self._turn_on = True
+                    self._last_fired = now
+                    return True
+            else:
+                self._turn_on = False
+                # Recognition only runs on the hero's turn, so whether the hero
+                # is still in the hand comes from the hole-card region instead
+                if self.cv.hero_has_cards():
+                    self.poller.hit() # Live hand: keep the turn latency at min_interval
+                else:
+                    self.poller.idle() # Folded or between hands
+            self.poller.wait()
+        return False
+
+    def _check_calibration(self):
+        """Cheap anchor check; the calibrator re-searches the screen only on drift."""
+        now = time.monotonic()
+        if self.calibrator is None or now - self._last_calibration < self.calibration_interval:
+            return
+        self._last_calibration = now
+        if not self.calibrator.ensure(self.cv, self.executor):
+            print("Table anchor not found, regions may be wrong.")
+
+    def _capture_loop(self):
+        # seq and turn numbers live on the pipeline so they survive a restart
+        while not self._stop.is_set():
+            self._check_calibration()
+            if self.turn_gate and not self._wait_for_turn():
+                break
+                
+            start = time.monotonic()
+            # Calibration replaces cv.regions; the frame keeps the layout it was grabbed with
+            regions = self.cv.regions
+            frame = Frame(self.cv.grab_frame(regions), regions)
+            self.frames.put(Stamped(self._seq, start, frame, self._turn if self.turn_gate else None))
+            self._seq += 1
+            
+            elapsed = time.monotonic() - start
+            if elapsed < self.capture_interval:
+                time.sleep(self.capture_interval - elapsed)
+
+    def _detect_loop(self):
+        # Each worker needs its own preprocessing buffers
+        preprocessor = FramePreprocessor(self.cv.preprocessor.binarize,
+                                         self.cv.preprocessor.binary_threshold,
+                                         self.cv.preprocessor.downscale)
+        while not self._stop.is_set():
+            item = self.frames.get(timeout=0.1)
+            if item is None:
+                continue
+            try:
+                if self.is_stale(item):
+                    self.stale += 1
+                    continue
+                state = self.cv.detect(item.payload.image, preprocessor, item.payload.regions)
+            finally:
+                self.cv.release_frame(item.payload.image)
+            self.states.put(Stamped(item.seq, item.timestamp, state, item.turn))
+
+    def _decide_loop(self):
+        while not self._stop.is_set():
+            item = self.states.get(timeout=0.1)
+            if item is None:
+                continue
+            # Workers can finish out of order; never go back in time
+            with self._seq_lock:
+                if item.seq <= self._last_seq:
+                    continue
+                self._last_seq = item.seq
+            if self.is_stale(item):
+                self.stale += 1
+                continue
+                
+            players = item.payload.get("players", [])
+            if len(players) > self.hero_seat:
+                self.hero_folded = players[self.hero_seat].get("status") == "folded"
+            if self.hero_folded:
+                continue
+                
+            # Act once per turn, or without the gate once per table state
+            decided = item.turn if item.turn is not None else self.decision_key(item.payload)
+            if decided == self._last_decided:
+                continue
+                
+            obs = self.builder.build_observation(item.payload)
+            action, _states = self.model.predict(obs, deterministic=True)
+            self._last_decided = decided
+            self.decisions += 1
+            self.actions.put(Stamped(item.seq, item.timestamp, int(action), item.turn))
+
+    @staticmethod
+    def decision_key(state):
+        """What a decision depends on: cards, pot and every seat's status and stack."""
+        players = tuple((p.get("status"), p.get("stack")) for p in state.get("players", []))
+        return (tuple(state.get("hand", [])), tuple(state.get("board", [])), state.get("pot"), players)
+
+    def _act_loop(self):
+        while not self._stop.is_set():
+            item = self.actions.get(timeout=0.1)
+            if item is None:
+                continue
+            if self.is_stale(item):
+                self.stale += 1
+                continue
+                
+            latency = (time.monotonic() - item.timestamp) * 1000
+            if self.act and self.executor is not None:
+                self.executor.execute_action(item.payload)
+            else:
+                print(f"Recommended Action: {item.payload} (frame {item.seq}, {latency:.0f} ms)")
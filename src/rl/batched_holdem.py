@@ -0,0 +1,305 @@
+import numpy as np
+
+try:
+    from .hand_eval import HandEvaluator
+except ImportError:
+    # Imported as a top-level module (train_agent.py runs from src/rl)
+    from hand_eval import HandEvaluator
+
+# rlcard no-limit action ids
+FOLD = 0
+CHECK_CALL = 1
+RAISE_HALF_POT = 2
+RAISE_POT = 3
+ALL_IN = 4
+NUM_ACTIONS = 5
+
+# Player status, same values as rlcard's PlayerStatus
+ALIVE = 0
+FOLDED = 1
+ALLIN = 2
+
+class BatchedHoldem:
+    """
+    Many no-limit hold'em tables stepped together as struct-of-arrays NumPy state.
+    Follows rlcard's 'no-limit-holdem' rules (blinds, pot-sized raises, round
+    and side-pot logic) so it can stand in for it as a PokerEnv backend.
+    Cards are rank*4+suit (S=0, H=1, D=2, C=3), same as PokerEnv observations.
+    """
+    def __init__(self, num_tables, num_players=6, small_blind=1, init_chips=100, seed=None):
+        self.num_tables = num_tables
+        self.num_players = num_players
+        self.small_blind = small_blind
+        self.big_blind = 2 * small_blind
+        self.init_chips = init_chips
+        self.rng = np.random.default_rng(seed)
+        self.evaluator = HandEvaluator()
+
+        T, P = num_tables, num_players
+        self.rows = np.arange(T)
+        # Deal order: hole cards round-robin from deck[:, 0], then the board
+        self.deck = np.zeros((T, 52), dtype=np.int64)
+        self.in_chips = np.zeros((T, P), dtype=np.int64)
+        self.remained = np.zeros((T, P), dtype=np.int64)
+        self.raised = np.zeros((T, P), dtype=np.int64)
+        self.status = np.zeros((T, P), dtype=np.int8)
+        # Like rlcard, the dealer is drawn once per table and then kept
+        self.dealer = np.full(T, -1, dtype=np.int64)
+        self.pointer = np.zeros(T, dtype=np.int64)
+        self.round_counter = np.zeros(T, dtype=np.int64)
+        self.stage = np.zeros(T, dtype=np.int64)
+        self.num_board = np.zeros(T, dtype=np.int64)
+        self.not_raise = np.zeros(T, dtype=np.int64)
+        self.not_playing = np.zeros(T, dtype=np.int64)
+        self.done = np.zeros(T, dtype=bool)
+        self.payoffs = np.zeros((T, P), dtype=np.float64)
+
+    def seed(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+
+    def reset(self, tables=None, decks=None, dealer_ids=None):
+        """
+        Starts a new hand on `tables` (bool mask or indices, default all).
+        `decks` (n, 52) and `dealer_ids` (n,) fix the deal for scripted hands.
+        """
+        t = self.rows if tables is None else self.rows[tables]
+        n = len(t)
+        if n == 0:
+            return
+        P = self.num_players
+
+        if dealer_ids is not None:
+            self.dealer[t] = dealer_ids
+        unset = t[self.dealer[t] < 0]
+        self.dealer[unset] = self.rng.integers(0, P, len(unset))
+        if decks is None:
+            decks = np.argsort(self.rng.random((n, 52)), axis=1)
+        self.deck[t] = decks
+
+        self.in_chips[t] = 0
+        self.remained[t] = self.init_chips
+        self.status[t] = ALIVE
+        d = self.dealer[t]
+        s = (d + 1) % P
+        b = (d + 2) % P
+        self._bet(t, b, np.full(n, self.big_blind))
+        self._bet(t, s, np.full(n, self.small_blind))
+        self.pointer[t] = (b + 1) % P
+        self.raised[t] = self.in_chips[t]
+        self.round_counter[t] = 0
+        self.stage[t] = 0
+        self.num_board[t] = 0
+        self.not_raise[t] = 0
+        self.not_playing[t] = 0
+        self.done[t] = False
+        self.payoffs[t] = 0.0
+
+    def _bet(self, t, p, chips):
+        quantity = np.minimum(chips, self.remained[t, p])
+        self.in_chips[t, p] += quantity
+        self.remained[t, p] -= quantity
+
+    def legal_actions(self, tables=None):
+        """
+        Returns a (n, 5) bool mask of legal rlcard actions for the player to act.
+        """
+        t = self.rows if tables is None else self.rows[tables]
+        p = self.pointer[t]
+        pot = self.in_chips[t].sum(1)
+        max_raised = self.raised[t].max(1)
+        own = self.raised[t, p]
+        rem = self.remained[t, p]
+        diff = max_raised - own
+        # Calling would put the player all-in: no raises
+        can_raise = ~((diff > 0) & (diff >= rem))
+
+        legal = np.zeros((len(t), NUM_ACTIONS), dtype=bool)
+        legal[:, FOLD] = True
+        legal[:, CHECK_CALL] = True
+        legal[:, RAISE_HALF_POT] = can_raise & (pot // 2 <= rem) & (pot // 2 + own > max_raised)
+        legal[:, RAISE_POT] = can_raise & (pot <= rem)
+        legal[:, ALL_IN] = can_raise
+        return legal
+
+    def map_actions(self, actions, legal=None):
+        """
+        Maps PokerEnv actions (0=fold, 1=check/call, 2=raise) to legal rlcard
+        actions, preferring the smallest legal raise like PokerEnv._map_action.
+        """
+        if legal is None:
+            legal = self.legal_actions()
+        actions = np.asarray(actions)
+        raise_action = np.select(
+            [legal[:, RAISE_HALF_POT], legal[:, RAISE_POT], legal[:, ALL_IN]],
+            [RAISE_HALF_POT, RAISE_POT, ALL_IN], default=CHECK_CALL)
+        return np.where(actions == 2, raise_action, np.where(actions == 0, FOLD, CHECK_CALL))
+
+    def step(self, actions):
+        """
+        Applies one rlcard action per table to every table that is not done.
+        Returns the done mask.
+        """
+        actions = np.asarray(actions)
+        t = self.rows[~self.done]
+        if len(t) == 0:
+            return self.done
+        P = self.num_players
+        a = actions[t]
+        p = self.pointer[t]
+        pot = self.in_chips[t].sum(1)
+        max_raised = self.raised[t].max(1)
+        own = self.raised[t, p]
+        rem = self.remained[t, p]
+
+        call = a == CHECK_CALL
+        raising = (a == RAISE_HALF_POT) | (a == RAISE_POT) | (a == ALL_IN)
+        amount = np.select(
+            [call, a == ALL_IN, a == RAISE_POT, a == RAISE_HALF_POT],
+            [max_raised - own, rem, pot, pot // 2], default=0)
+        self.raised[t, p] = np.where(call, max_raised, own + amount)
+        self._bet(t, p, amount)
+        self.not_raise[t] = np.where(call, self.not_raise[t] + 1,
+                                     np.where(raising, 1, self.not_raise[t]))
+
+        status = np.where(a == FOLD, FOLDED, self.status[t, p])
+        status = np.where((self.remained[t, p] == 0) & (status != FOLDED), ALLIN, status)
+        self.status[t, p] = status
+        self.not_playing[t] += (status != ALIVE)
+        self.not_raise[t] -= (status == ALLIN)
+
+        # Next player, skipping folded seats
+        p = (p + 1) % P
+        for _ in range(P):
+            p = np.where(self.status[t, p] == FOLDED, (p + 1) % P, p)
+        self.pointer[t] = p
+
+        # Players that no longer act this hand; a lone live player who has
+        # matched the highest bet has nothing left to do either
+        status = self.status[t]
+        raised = self.raised[t]
+        bypass = status != ALIVE
+        lone = (~bypass).sum(1) == 1
+        last = np.argmin(bypass, axis=1)
+        bypass[lone, last[lone]] = raised[lone, last[lone]] >= raised[lone].max(1)
+
+        over = self.not_raise[t] + self.not_playing[t] >= P
+        if over.any():
+            self._next_round(t[over], bypass[over])
+
+        alive = (self.status[t] != FOLDED).sum(1)
+        finished = (alive == 1) | (self.round_counter[t] >= 4)
+        if finished.any():
+            self.done[t[finished]] = True
+            self._settle(t[finished])
+        return self.done
+
+    def _next_round(self, t, bypass):
+        P = self.num_players
+        all_bypass = bypass.all(1)
+        # First player not bypassed after the dealer
+        p = (self.dealer[t] + 1) % P
+        for _ in range(P):
+            p = np.where(~all_bypass & bypass[np.arange(len(t)), p], (p + 1) % P, p)
+        self.pointer[t] = p
+
+        # Deal the next street; if nobody can act, run the board out
+        rc = self.round_counter[t]
+        for counter, cards in ((0, 3), (1, 4), (2, 5)):
+            hit = rc == counter
+            self.stage[t[hit]] = counter + 1
+            self.num_board[t[hit]] = cards
+            rc = np.where(hit & all_bypass, rc + 1, rc)
+        self.round_counter[t] = rc + 1
+        self.not_raise[t] = 0
+        self.raised[t] = 0
+
+    def hole_cards(self, tables=None):
+        """
+        Returns (n, P, 2) hole cards.
+        """
+        t = self.rows if tables is None else self.rows[tables]
+        P = self.num_players
+        return np.stack([self.deck[t, :P], self.deck[t, P:2 * P]], axis=-1)
+
+    def board_cards(self, tables=None):
+        """
+        Returns (n, 5) board cards with undealt cards as -1.
+        """
+        t = self.rows if tables is None else self.rows[tables]
+        P = self.num_players
+        board = self.deck[t, 2 * P:2 * P + 5]
+        return np.where(np.arange(5) < self.num_board[t, None], board, -1)
+
+    def _settle(self, t):
+        """
+        Computes payoffs for finished tables with rlcard's pot splitting: a
+        single set of winners (best hand among live players) is paid pot by
+        pot, and a side pot none of them is in goes back to whoever paid it.
+        """
+        P = self.num_players
+        live = self.status[t] != FOLDED
+        winners = live.copy()
+        showdown = live.sum(1) > 1
+        if showdown.any():
+            s = t[showdown]
+            cards = np.concatenate([
+                self.hole_cards(s),
+                np.broadcast_to(self.deck[s, None, 2 * P:2 * P + 5], (len(s), P, 5))], axis=-1)
+            score = np.where(live[showdown], self.evaluator.evaluate(cards).astype(np.int32), -1)
+            winners[showdown] = score == score.max(1, keepdims=True)
+
+        chips = self.in_chips[t].copy()
+        won = np.zeros_like(chips)
+        # Odd chips go to the first winner left of the dealer
+        seat_order = (np.arange(P) - self.dealer[t, None] - 1) % P
+        for _ in range(P):
+            in_pot = chips > 0
+            if not in_pot.any():
+                break
+            n_players = in_pot.sum(1)
+            n_winners = (winners & in_pot).sum(1)
+            refund = (n_winners == 0) | (n_winners == n_players)
+            layer = np.where(in_pot, chips, np.iinfo(chips.dtype).max).min(1)
+            layer = np.where(n_players > 0, layer, 0)
+
+            won += np.where(refund[:, None], chips, 0)
+            share, odd = np.divmod(layer * n_players, np.maximum(n_winners, 1))
+            split = ~refund
+            won += np.where(split[:, None] & winners & in_pot, share[:, None], 0)
+            first = np.argmin(np.where(winners & in_pot, seat_order, P), axis=1)
+            won[np.flatnonzero(split), first[split]] += odd[split]
+            chips = np.where(refund[:, None], 0, np.where(in_pot, chips - layer[:, None], chips))
+        self.payoffs[t] = won - self.in_chips[t]
+
+    def observe(self, tables=None):
+        """
+        Returns PokerEnv observations for the player to act, batched over
+        tables: every key has a leading (n,) axis.
+        """
+        t = self.rows if tables is None else self.rows[tables]
+        n = len(t)
+        P = self.num_players
+        p = self.pointer[t]
+        scale = float(self.init_chips)
+
+        hand = np.stack([self.deck[t, p], self.deck[t, p + P]], axis=1)
+        legal = self.legal_actions(t)
+        folded = (self.status[t] == FOLDED).astype(np.float32)
+        players = np.zeros((n, 6, 4), dtype=np.float32)
+        players[:, :P, 0] = 1.0 - folded
+        players[:, :P, 1] = self.in_chips[t] / scale
+        players[:, :P, 3] = folded
+
+        return {
+            "hand": hand.astype(np.int32),
+            "board": self.board_cards(t).astype(np.int32),
+            "pot": (self.in_chips[t].sum(1, keepdims=True) / scale).astype(np.float32),
+            "my_stack": (self.in_chips[t, p][:, None] / scale).astype(np.float32),
+            "my_bet": np.zeros((n, 1), dtype=np.float32),
+            "players": players,
+            "position": p[:, None].astype(np.int32),
+            "street": self.stage[t, None].astype(np.int32),
+            "legal_actions": np.stack(
+                [legal[:, FOLD], legal[:, CHECK_CALL], legal[:, RAISE_HALF_POT:].any(1)],
+                axis=1).astype(np.int32),
+        }
@@ -0,0 +1,91 @@
+import inspect
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnv
+
+try:
+    from .batched_holdem import BatchedHoldem
+    from .poker_env import PokerEnv
+except ImportError:
+    # Imported as a top-level module (train_agent.py runs from src/rl)
+    from batched_holdem import BatchedHoldem
+    from poker_env import PokerEnv
+
+class BatchedHoldemVecEnv(VecEnv):
+    """
+    Stable-Baselines3 VecEnv with one BatchedHoldem table per environment.
+    All tables step in a single process with vectorized NumPy; finished
+    tables are reset automatically like SubprocVecEnv does.
+    """
+    def __init__(self, num_envs, num_players=6, seed=None, include_equity=False, equity_estimator=None,
+                 equity_tables=None):
+        spaces = PokerEnv(num_players=num_players, backend="batched", include_equity=include_equity,
+                          equity_estimator=equity_estimator, equity_tables=equity_tables)
+        super(BatchedHoldemVecEnv, self).__init__(num_envs, spaces.observation_space, spaces.action_space)
+        self.engine = BatchedHoldem(num_envs, num_players=num_players, seed=seed)
+        self.equity_estimator = spaces.equity_estimator
+        self.actions = np.zeros(num_envs, dtype=np.int64)
+
+    def reset(self):
+        self.engine.reset()
+        return self._observe()
+
+    def _observe(self, tables=None):
+        obs = self.engine.observe(tables)
+        if self.equity_estimator is not None:
+            opponents = obs["players"][:, :, 0].sum(1).astype(np.int64) - 1
+            obs["equity"] = self.equity_estimator.equity_batch(obs["hand"], obs["board"], opponents)[:, None]
+        return obs
+
+    def step_async(self, actions):
+        self.actions = np.asarray(actions).reshape(-1)
+
+    def step_wait(self):
+        engine = self.engine
+        engine.step(engine.map_actions(self.actions))
+        dones = engine.done.copy()
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        infos = [{} for _ in range(self.num_envs)]
+        finished = np.flatnonzero(dones)
+        if len(finished):
+            # Same convention as PokerEnv: payoff of the seat the game points at
+            rewards[finished] = engine.payoffs[finished, engine.pointer[finished]]
+            terminal = self._observe(finished)
+            for j, i in enumerate(finished):
+                infos[i]["terminal_observation"] = {key: value[j] for key, value in terminal.items()}
+                infos[i]["TimeLimit.truncated"] = False
+            engine.reset(finished)
+        return self._observe(), rewards, dones, infos
+
+    def seed(self, seed=None):
+        self.engine.seed(seed)
+        return [seed] * self.num_envs
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self, attr_name)] * len(self._get_indices(indices))
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        """
+        Calls a BatchedHoldem method for the given environments. Methods with
+        a `tables` argument (hole_cards, legal_actions, observe, reset, ...)
+        run once on those tables and their result is split per environment;
+        others (e.g. seed) run once and every environment gets the result.
+        """
+        indices = list(self._get_indices(indices))
+        method = getattr(self.engine, method_name)
+        if "tables" not in inspect.signature(method).parameters:
+            return [method(*method_args, **method_kwargs)] * len(indices)
+        result = method(*method_args, tables=np.array(indices, dtype=np.int64), **method_kwargs)
+        if result is None:
+            return [None] * len(indices)
+        if isinstance(result, dict):
+            return [{key: value[j] for key, value in result.items()} for j in range(len(indices))]
+        return list(result)
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False] * len(self._get_indices(indices))
@@ -0,0 +1,210 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+try:
+    from .hand_eval import HandEvaluator
+except ImportError:
+    # Imported as a top-level module (train_agent.py runs from src/rl)
+    from hand_eval import HandEvaluator
+
+# All 24 relabelings of the four suits
+SUIT_PERMUTATIONS = np.array(list(itertools.permutations(range(4))), dtype=np.int64)
+MAX_OPPONENTS = 5
+
+def canonical_keys(hands, boards, num_opponents):
+    """
+    Integer keys for (N, 2) hands, (N, 5) boards (-1 = not dealt) and
+    opponent counts that are equal for suit-isomorphic situations.
+    """
+    cards = np.concatenate([hands, boards], axis=1).astype(np.int64)
+    ranks = cards >> 2
+    suits = cards & 3
+    # (N, 24, 7): every suit relabeling, undealt cards stay -1
+    mapped = np.where(cards[:, None] >= 0, ranks[:, None] * 4 + SUIT_PERMUTATIONS[:, suits].transpose(1, 0, 2), -1)
+    hand = np.sort(mapped[..., :2], axis=-1)
+    board = np.sort(mapped[..., 2:], axis=-1)
+
+    key = np.asarray(num_opponents, dtype=np.int64)[:, None].repeat(len(SUIT_PERMUTATIONS), 1)
+    for digits in (hand, board):
+        for i in range(digits.shape[-1]):
+            key = key * 53 + digits[..., i] + 1
+    return key.min(axis=1)
+
+def valid_situations(hands, boards):
+    """
+    Rows of (N, 2) hands and (N, 5) boards (-1 = not dealt) whose hole cards
+    are both known, whose cards are all in 0-51 and where no card repeats.
+    """
+    cards = np.concatenate([hands, boards], axis=1)
+    valid = (hands >= 0).all(1) & (cards < 52).all(1)
+    # Undealt slots get distinct negative stand-ins so they never match
+    cards = np.sort(np.where(cards >= 0, cards, -1 - np.arange(cards.shape[1])), axis=1)
+    return valid & (cards[:, 1:] != cards[:, :-1]).all(1)
+
+class EquityEstimator:
+    """
+    Monte Carlo equity of a hand against `num_opponents` random hands: the
+    chance of winning the pot, with split pots counted as a share. Unknown
+    board and opponent cards are sampled for many situations at once and
+    scored with HandEvaluator.
+
+    Each call stops after `num_samples` or, if set, once `time_budget`
+    seconds have passed (at least one round is always sampled). Complete
+    results are cached by a suit-isomorphic canonical key, so AhKh on
+    2h7c9d and AsKs on 2s7d9c share one entry; estimates cut short by the
+    time budget are returned but not cached. Preflop and flop situations found in
+    precomputed `tables` (see equity_tables.py) skip sampling entirely.
+    """
+    def __init__(self, num_samples=500, time_budget=None, cache_size=65536, chunk_size=65536, seed=None,
+                 tables=None):
+        # chunk_size: situations x samples simulated per round, bounds memory
+        self.num_samples = num_samples
+        self.time_budget = time_budget
+        self.cache_size = cache_size
+        self.chunk_size = chunk_size
+        self.rng = np.random.default_rng(seed)
+        self.evaluator = HandEvaluator()
+        self.tables = tables
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def equity(self, hand, board=(), num_opponents=1):
+        """
+        Equity of one hand, e.g. equity([48, 44], [0, 21, 30], 2).
+        """
+        hands = np.array([list(hand)[:2]], dtype=np.int64)
+        boards = np.full((1, 5), -1, dtype=np.int64)
+        boards[0, :len(board)] = board
+        return float(self.equity_batch(hands, boards, [num_opponents])[0])
+
+    def equity_batch(self, hands, boards, num_opponents):
+        """
+        Equities of N situations: (N, 2) hands, (N, 5) boards padded with -1
+        and (N,) opponent counts. Rows with a missing hole card, a card out of
+        range or a repeated card (a misread) get 0, rows without opponents 1.
+        """
+        hands = np.asarray(hands, dtype=np.int64)
+        boards = np.asarray(boards, dtype=np.int64)
+        num_opponents = np.minimum(np.asarray(num_opponents, dtype=np.int64), MAX_OPPONENTS)
+        result = np.zeros(len(hands), dtype=np.float32)
+        valid = valid_situations(hands, boards)
+        # Everyone else folded: the pot is ours
+        uncontested = valid & (num_opponents <= 0)
+        result[uncontested] = 1.0
+        valid &= ~uncontested
+        if self.tables is not None and valid.any():
+            rows = np.flatnonzero(valid)
+            equity, found = self.tables.lookup(hands[rows], boards[rows], num_opponents[rows])
+            result[rows[found]] = equity[found]
+            valid[rows[found]] = False
+        valid = np.flatnonzero(valid)
+        if len(valid) == 0:
+            return result
+
+        keys = canonical_keys(hands[valid], boards[valid], num_opponents[valid])
+        missing = {}
+        with self._lock:
+            for row, key in zip(valid, keys.tolist()):
+                value = self.cache.get(key)
+                if value is None:
+                    self.misses += 1
+                    missing.setdefault(key, row)
+                else:
+                    self.cache.move_to_end(key)
+                    self.hits += 1
+                    result[row] = value
+
+        if missing:
+            rows = np.array(list(missing.values()))
+            values, samples = self._simulate(hands[rows], boards[rows], num_opponents[rows])
+            with self._lock:
+                for key, value, count in zip(missing, values.tolist(), samples.tolist()):
+                    if count >= self.num_samples:
+                        self.cache[key] = value
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+            lookup = dict(zip(missing, values))
+            for row, key in zip(valid, keys.tolist()):
+                if key in lookup:
+                    result[row] = lookup[key]
+        return result
+
+    def _simulate(self, hands, boards, num_opponents):
+        """
+        Equities by sampling, one pass per opponent count so that rows with
+        fewer opponents don't pay for evaluating empty seats. Returns
+        (equities, samples taken per row).
+        """
+        values = np.zeros(len(hands))
+        samples = np.zeros(len(hands), dtype=np.int64)
+        for count in np.unique(num_opponents):
+            rows = np.flatnonzero(num_opponents == count)
+            values[rows], samples[rows] = self._simulate_group(hands[rows], boards[rows], int(count))
+        return values, samples
+
+    def _simulate_group(self, hands, boards, num_opp):
+        n = len(hands)
+        to_deal = boards < 0
+        num_missing = to_deal.sum(1)
+        num_draw = int(num_missing.max()) + 2 * num_opp
+        # j-th undealt board slot takes the j-th drawn card; opponents follow
+        board_slot = np.maximum(np.cumsum(to_deal, axis=1) - 1, 0)
+        opp_slot = num_missing[:, None] + np.arange(2 * num_opp)
+
+        known = np.zeros((n, 52), dtype=bool)
+        rows = np.arange(n)[:, None]
+        known[rows, hands] = True
+        known[rows, np.where(boards >= 0, boards, hands[:, :1])] = True
+        # Each row's remaining deck first, known cards after it
+        remaining = np.argsort(known, axis=1, kind="stable").astype(np.int8)
+        num_remaining = 52 - known.sum(1)
+
+        wins = np.zeros(n)
+        total = 0
+        round_size = max(16, min(self.num_samples, self.chunk_size // n, 1024))
+        start = time.perf_counter()
+        while total < self.num_samples:
+            s = min(round_size, self.num_samples - total)
+            # Partial Fisher-Yates shuffle of a copy of the deck per sample:
+            # only the first num_draw positions are ever settled
+            deck = np.repeat(remaining, s, axis=0)
+            size = np.repeat(num_remaining, s)
+            flat = np.arange(len(deck))
+            for j in range(num_draw):
+                pick = j + (self.rng.random(len(deck)) * (size - j)).astype(np.intp)
+                card = deck[flat, pick]
+                deck[flat, pick] = deck[flat, j]
+                deck[flat, j] = card
+            drawn = deck[:, :num_draw].reshape(n, s, num_draw).astype(np.int64)
+
+            board = np.where(to_deal[:, None], np.take_along_axis(drawn, np.broadcast_to(board_slot[:, None], (n, s, 5)), -1),
+                             boards[:, None])
+            opp = np.take_along_axis(drawn, np.broadcast_to(opp_slot[:, None], (n, s, 2 * num_opp)), -1)
+            opp = opp.reshape(n, s, num_opp, 2)
+
+            hero = self.evaluator.evaluate(np.concatenate([np.broadcast_to(hands[:, None], (n, s, 2)), board], -1))
+            villains = self.evaluator.evaluate(np.concatenate(
+                [opp, np.broadcast_to(board[:, :, None], (n, s, num_opp, 5))], -1))
+            best = villains.max(-1)
+            ties = (villains == hero[..., None]).sum(-1)
+            wins += np.where(hero > best, 1.0, np.where(hero == best, 1.0 / (1 + ties), 0.0)).sum(1)
+            total += s
+            if self.time_budget is not None and time.perf_counter() - start >= self.time_budget:
+                break
+        return wins / total, total
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        with self._lock:
+            self.cache.clear()
+            self.hits = 0
+            self.misses = 0
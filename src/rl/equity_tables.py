@@ -0,0 +1,182 @@
+import os
+import numpy as np
+
+try:
+    from .equity import canonical_keys
+except ImportError:
+    # Imported as a top-level module (train_agent.py runs from src/rl)
+    from equity import canonical_keys
+
+TABLES_VERSION = 1
+TABLES_MAGIC = b"PVEQTABL"
+DEFAULT_TABLES_PATH = "data/equity_tables.bin"
+NUM_PREFLOP_CLASSES = 169
+
+HEADER = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u4"),
+    ("max_opponents", "<u4"),
+    ("num_flop", "<u8"),
+    ("preflop_samples", "<u8"),
+    ("flop_samples", "<u8"),
+])
+HEADER_SIZE = 64
+
+def _layout(max_opponents, num_flop):
+    """
+    Byte offsets of the preflop table, flop keys and flop table, each 64-byte aligned.
+    """
+    align = lambda offset: (offset + 63) // 64 * 64
+    preflop = HEADER_SIZE
+    keys = align(preflop + NUM_PREFLOP_CLASSES * max_opponents * 4)
+    flop = align(keys + num_flop * 8)
+    return preflop, keys, flop
+
+def preflop_class(hands):
+    """
+    Index 0-168 of (N, 2) hole cards in the 13x13 grid: pairs on the
+    diagonal, suited hands above it (row = high rank), offsuit below.
+    """
+    hands = np.asarray(hands, dtype=np.int64)
+    ranks = hands >> 2
+    high = ranks.max(1)
+    low = ranks.min(1)
+    suited = (hands[:, 0] & 3) == (hands[:, 1] & 3)
+    return np.where(suited, high * 13 + low, low * 13 + high)
+
+def preflop_representatives():
+    """
+    One (169, 2) hand per preflop class, in preflop_class order.
+    """
+    hands = np.zeros((NUM_PREFLOP_CLASSES, 2), dtype=np.int64)
+    for row in range(13):
+        for col in range(13):
+            if row > col:
+                hands[row * 13 + col] = [row * 4, col * 4]
+            elif row < col:
+                hands[row * 13 + col] = [col * 4, row * 4 + 1]
+            else:
+                hands[row * 13 + col] = [row * 4, row * 4 + 1]
+    return hands
+
+def canonical_flops():
+    """
+    Every suit-isomorphic (hand, flop) situation once. Returns sorted keys
+    and (M, 2) hands and (M, 5) boards (last two cards -1) to evaluate.
+    Any hand can be relabeled to its class representative, so flops
+    against the 169 representatives cover all situations.
+    """
+    flops = np.array([(a, b, c) for a in range(52) for b in range(a + 1, 52) for c in range(b + 1, 52)])
+    keys, hands, boards = [], [], []
+    for hand in preflop_representatives():
+        rows = flops[~np.isin(flops, hand).any(1)]
+        board = np.concatenate([rows, np.full((len(rows), 2), -1)], axis=1)
+        hand_rows = np.broadcast_to(hand, (len(rows), 2))
+        keys.append(canonical_keys(hand_rows, board, np.zeros(len(rows), dtype=np.int64)))
+        hands.append(hand_rows)
+        boards.append(board)
+    keys = np.concatenate(keys)
+    keys, first = np.unique(keys, return_index=True)
+    return keys, np.concatenate(hands)[first], np.concatenate(boards)[first]
+
+class EquityTables:
+    """
+    Precomputed equities, memory-mapped read-only: opening is O(1) and the
+    pages are shared by every process that maps the same file.
+
+    preflop: (169, max_opponents) by preflop_class and opponents - 1
+    flop_keys / flop: sorted canonical (hand, flop) keys and their
+    (M, max_opponents) equities, found with searchsorted.
+    """
+    def __init__(self, path):
+        header = np.fromfile(path, dtype=HEADER, count=1)
+        if len(header) == 0 or header["magic"][0] != TABLES_MAGIC:
+            raise ValueError(f"{path} is not an equity tables file")
+        header = header[0]
+        version = int(header["version"])
+        if version != TABLES_VERSION:
+            raise ValueError(f"Equity tables {path} have version {version}, expected {TABLES_VERSION}")
+
+        self.path = path
+        self.max_opponents = int(header["max_opponents"])
+        self.preflop_samples = int(header["preflop_samples"])
+        self.flop_samples = int(header["flop_samples"])
+        num_flop = int(header["num_flop"])
+        preflop, keys, flop = _layout(self.max_opponents, num_flop)
+        self.preflop = np.memmap(path, dtype="<f4", mode="r", offset=preflop,
+                                 shape=(NUM_PREFLOP_CLASSES, self.max_opponents))
+        if num_flop:
+            self.flop_keys = np.memmap(path, dtype="<i8", mode="r", offset=keys, shape=(num_flop,))
+            self.flop = np.memmap(path, dtype="<f4", mode="r", offset=flop, shape=(num_flop, self.max_opponents))
+        else:
+            self.flop_keys = np.zeros(0, dtype=np.int64)
+            self.flop = np.zeros((0, self.max_opponents), dtype=np.float32)
+
+    def lookup(self, hands, boards, num_opponents):
+        """
+        Equities for (N, 2) hands, (N, 5) boards (-1 = not dealt) and (N,)
+        opponent counts. Returns (equity, found); only preflop and flop
+        situations can be found.
+        """
+        hands = np.asarray(hands, dtype=np.int64)
+        boards = np.asarray(boards, dtype=np.int64)
+        opponent = np.clip(np.asarray(num_opponents, dtype=np.int64), 1, self.max_opponents) - 1
+        equity = np.zeros(len(hands), dtype=np.float32)
+        found = np.zeros(len(hands), dtype=bool)
+
+        valid = (hands >= 0).all(1)
+        num_board = (boards >= 0).sum(1)
+        pre = np.flatnonzero(valid & (num_board == 0))
+        if len(pre):
+            equity[pre] = self.preflop[preflop_class(hands[pre]), opponent[pre]]
+            found[pre] = True
+
+        flop = np.flatnonzero(valid & (num_board == 3))
+        if len(flop) and len(self.flop_keys):
+            keys = canonical_keys(hands[flop], boards[flop], np.zeros(len(flop), dtype=np.int64))
+            pos = np.minimum(np.searchsorted(self.flop_keys, keys), len(self.flop_keys) - 1)
+            hit = self.flop_keys[pos] == keys
+            equity[flop[hit]] = self.flop[pos[hit], opponent[flop[hit]]]
+            found[flop[hit]] = True
+        return equity, found
+
+def write_tables(path, preflop, flop_keys, flop, preflop_samples=0, flop_samples=0):
+    """
+    Writes tables in the layout EquityTables maps. flop_keys must be sorted.
+    """
+    preflop = np.asarray(preflop, dtype="<f4")
+    flop_keys = np.asarray(flop_keys, dtype="<i8")
+    flop = np.asarray(flop, dtype="<f4").reshape(len(flop_keys), preflop.shape[1])
+    header = np.zeros(1, dtype=HEADER)
+    header["magic"] = TABLES_MAGIC
+    header["version"] = TABLES_VERSION
+    header["max_opponents"] = preflop.shape[1]
+    header["num_flop"] = len(flop_keys)
+    header["preflop_samples"] = preflop_samples
+    header["flop_samples"] = flop_samples
+
+    offsets = _layout(preflop.shape[1], len(flop_keys))
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(header.tobytes())
+        for offset, array in zip(offsets, (preflop, flop_keys, flop)):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(np.ascontiguousarray(array).tobytes())
+    return path
+
+def load_tables(path):
+    """Opens a tables file written by write_tables. Raises ValueError on a bad file or version."""
+    return EquityTables(path)
+
+def find_tables(path=DEFAULT_TABLES_PATH):
+    """
+    Returns the tables at `path`, an EquityTables passed through, or None
+    if there is no file.
+    """
+    if path is None or isinstance(path, EquityTables):
+        return path
+    if not os.path.exists(path):
+        return None
+    return load_tables(path)
@@ -0,0 +1,198 @@
+import numpy as np
+
+# Hand categories, in the top bits of a hand value
+HIGH_CARD = 0
+PAIR = 1
+TWO_PAIR = 2
+THREE_OF_A_KIND = 3
+STRAIGHT = 4
+FLUSH = 5
+FULL_HOUSE = 6
+FOUR_OF_A_KIND = 7
+STRAIGHT_FLUSH = 8
+CATEGORY_NAMES = ["High Card", "Pair", "Two Pair", "Three of a Kind", "Straight",
+                  "Flush", "Full House", "Four of a Kind", "Straight Flush"]
+CATEGORY_SHIFT = 20
+
+# Per-rank weights whose sums are unique over every multiset of 7 ranks
+# (at most 4 of a rank), so a 7-card rank pattern indexes a flat table
+RANK_WEIGHTS = np.array([0, 1, 5, 22, 98, 453, 2031, 8698, 22854, 83661,
+                         262349, 636345, 1479181], dtype=np.int64)
+CARD_WEIGHTS = np.repeat(RANK_WEIGHTS, 4)
+# Suit counts packed in 3-bit fields; one lookup tells whether a suit has 5+
+CARD_SUIT_BITS = np.tile(1 << (3 * np.arange(4)), 13)
+CARD_RANK_BITS = np.repeat(1 << np.arange(13), 4)
+
+def combos(n, k=5):
+    """
+    Returns all k-subsets of range(n) as an (m, k) index array.
+    """
+    out = [[]]
+    for _ in range(k):
+        out = [c + [i] for c in out for i in range((c[-1] + 1) if c else 0, n)]
+    return np.array([c for c in out if len(c) == k], dtype=np.intp)
+
+def evaluate_5(cards):
+    """
+    Brute-force value of 5-card hands (..., 5) of card ids (rank*4+suit).
+    Higher is better and equal values are exact ties. Used to build the
+    lookup tables and as a reference; use HandEvaluator for speed.
+    """
+    ranks = cards // 4
+    suits = cards % 4
+    # Count of each card's rank within its hand
+    counts = (ranks[..., :, None] == ranks[..., None, :]).sum(-1)
+    # Group by count then rank, highest first: pairs before kickers etc.
+    order = np.argsort(-(counts * 16 + ranks), axis=-1, kind="stable")
+    ranks = np.take_along_axis(ranks, order, -1)
+    counts = np.take_along_axis(counts, order, -1)
+
+    flush = (suits == suits[..., :1]).all(-1)
+    distinct = counts[..., 0] == 1
+    straight = distinct & (ranks[..., 0] - ranks[..., 4] == 4)
+    wheel = distinct & (ranks[..., 0] == 12) & (ranks[..., 1] == 3)
+    straight |= wheel
+
+    category = np.full(ranks.shape[:-1], HIGH_CARD, dtype=np.int64)
+    category[(counts[..., 0] == 2)] = PAIR
+    category[(counts[..., 0] == 2) & (counts[..., 3] == 2)] = TWO_PAIR
+    category[(counts[..., 0] == 3)] = THREE_OF_A_KIND
+    category[straight] = STRAIGHT
+    category[flush] = FLUSH
+    category[(counts[..., 0] == 3) & (counts[..., 3] == 2)] = FULL_HOUSE
+    category[(counts[..., 0] == 4)] = FOUR_OF_A_KIND
+    category[straight & flush] = STRAIGHT_FLUSH
+
+    # Wheel plays as 5-high; digits are rank + 1 in 4-bit fields
+    ranks = np.where(wheel[..., None], np.array([3, 2, 1, 0, -1]), ranks)
+    value = category
+    for i in range(5):
+        value = (value << 4) | (ranks[..., i] + 1)
+    return value
+
+def evaluate_best(cards):
+    """
+    Brute-force value of 5-7 card hands (..., n) as the best 5-card subset.
+    """
+    return evaluate_5(cards[..., combos(cards.shape[-1])]).max(-1)
+
+def _rank_multisets(n):
+    """
+    All multisets of n ranks with at most 4 of a rank, as (m, 13) counts.
+    """
+    out = [np.zeros(13, dtype=np.int64)]
+    for _ in range(n):
+        grown = {}
+        for counts in out:
+            for r in range(13):
+                if counts[r] < 4:
+                    c = counts.copy()
+                    c[r] += 1
+                    grown[c.tobytes()] = c
+        out = list(grown.values())
+    return np.array(out)
+
+def _expand(counts):
+    """
+    Turns rank counts (m, 13) into cards (m, n) with ranks sorted and suits
+    dealt round-robin: no five cards share a suit and paired cards differ in suit.
+    """
+    n = int(counts[0].sum())
+    ranks = np.repeat(np.tile(np.arange(13), (len(counts), 1)).ravel(), counts.ravel()).reshape(-1, n)
+    return ranks * 4 + np.arange(n) % 4
+
+class HandEvaluator:
+    """
+    Lookup-table evaluator for 5-7 card hands in the 0-51 encoding
+    (rank*4+suit). evaluate() returns the hand's strength class, 0 (7-5-4-3-2
+    offsuit) to 7461 (royal flush): higher wins, equal is a tie.
+
+    Flushes are looked up by the 13-bit rank mask of the flush suit (8192
+    entries). Other 7-card hands index a flat table by the sum of their
+    rank weights; 5 and 6 card hands use searchsorted on sorted keys.
+    Tables take a couple of seconds to build and are shared per process.
+    """
+    _tables = None
+
+    def __init__(self):
+        if HandEvaluator._tables is None:
+            HandEvaluator._tables = self._build_tables()
+        (self.flush_table, self.table_7, self.keys, self.values,
+         self.flush_suit, self.class_values) = HandEvaluator._tables
+
+    @staticmethod
+    def _build_tables():
+        # Flushes: best 5 of the set bits, all in one suit
+        flush_values = np.zeros(1 << 13, dtype=np.int64)
+        masks = np.arange(1 << 13)
+        bits = (masks[:, None] >> np.arange(13)) & 1
+        popcount = bits.sum(1)
+        for n in (5, 6, 7):
+            sel = masks[popcount == n]
+            ranks = np.nonzero(bits[sel])[1].reshape(-1, n)
+            flush_values[sel] = evaluate_best(ranks * 4)
+
+        # Everything else: one entry per rank multiset
+        keys, values = {}, {}
+        for n in (5, 6, 7):
+            counts = _rank_multisets(n)
+            keys[n] = counts @ RANK_WEIGHTS
+            values[n] = evaluate_best(_expand(counts))
+
+        # Compress evaluate_5 values to strength classes; masks of 8+ bits
+        # never occur in a 7-card hand and stay unfilled
+        flush_masks = (popcount >= 5) & (popcount <= 7)
+        class_values = np.unique(np.concatenate([flush_values[flush_masks]] + list(values.values())))
+        to_class = lambda v: np.searchsorted(class_values, v).astype(np.uint16)
+        flush_table = np.where(flush_masks, to_class(flush_values), 0).astype(np.uint16)
+
+        table_7 = np.zeros(keys[7].max() + 1, dtype=np.uint16)
+        table_7[keys[7]] = to_class(values[7])
+
+        sorted_keys, sorted_values = {}, {}
+        for n in (5, 6):
+            order = np.argsort(keys[n])
+            sorted_keys[n] = keys[n][order]
+            sorted_values[n] = to_class(values[n][order])
+
+        # Packed suit counts -> suit with 5+ cards, or -1
+        packed = np.arange(1 << 12)
+        suit_counts = (packed[:, None] >> (3 * np.arange(4))) & 7
+        flush_suit = np.where(suit_counts.max(1) >= 5, suit_counts.argmax(1), -1).astype(np.int8)
+        return flush_table, table_7, sorted_keys, sorted_values, flush_suit, class_values
+
+    def evaluate(self, cards):
+        """
+        Strength classes of hands (..., n), 5 <= n <= 7 distinct cards.
+        """
+        cards = np.asarray(cards)
+        shape = cards.shape[:-1]
+        n = cards.shape[-1]
+        cards = cards.reshape(-1, n)
+        key = CARD_WEIGHTS[cards].sum(-1)
+        if n == 7:
+            values = self.table_7[key]
+        else:
+            values = self.values[n][np.searchsorted(self.keys[n], key)]
+
+        flush_suit = self.flush_suit[CARD_SUIT_BITS[cards].sum(-1)]
+        flush = flush_suit >= 0
+        if flush.any():
+            hands = cards[flush]
+            in_suit = (hands & 3) == flush_suit[flush][:, None]
+            mask = np.where(in_suit, CARD_RANK_BITS[hands], 0).sum(-1)
+            values[flush] = self.flush_table[mask]
+        return values.reshape(shape)
+
+    def category(self, classes):
+        """
+        Hand category (HIGH_CARD .. STRAIGHT_FLUSH) of strength classes.
+        """
+        return self.class_values[classes] >> CATEGORY_SHIFT
+
+    def compare(self, hands):
+        """
+        Winner mask for hands (..., players, n); ties share the win.
+        """
+        values = self.evaluate(hands)
+        return values == values.max(-1, keepdims=True)
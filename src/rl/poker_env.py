@@ -4,6 +4,16 @@ import numpy as np
 import rlcard
 from rlcard.agents import RandomAgent
 
+try:
+    from .batched_holdem import BatchedHoldem
+    from .equity import EquityEstimator
+    from .equity_tables import find_tables
+except ImportError:
+    # Imported as a top-level module (train_agent.py runs from src/rl)
+    from batched_holdem import BatchedHoldem
+    from equity import EquityEstimator
+    from equity_tables import find_tables
+
 class PokerEnv(gym.Env):
     """
     Custom Environment that follows gym interface.
@@ -11,12 +21,19 @@ class PokerEnv(gym.Env):
     """
     metadata = {'render.modes': ['human']}
 
-    def __init__(self, num_players=6):
+    def __init__(self, num_players=6, backend="rlcard", include_equity=False, equity_estimator=None,
+                 equity_tables=None):
         super(PokerEnv, self).__init__()
         self.num_players = num_players
+        if backend not in ("rlcard", "batched"):
+            raise ValueError(f"Unknown backend: {backend}")
+        self.backend = backend
         
-        # Create rlcard environment
-        self.game = rlcard.make('no-limit-holdem', config={'game_num_players': num_players})
+        # Create rlcard environment, or a one-table NumPy engine with the same rules
+        if backend == "batched":
+            self.engine = BatchedHoldem(1, num_players=num_players)
+        else:
+            self.game = rlcard.make('no-limit-holdem', config={'game_num_players': num_players})
         
         # Define Action Space
         # 0: Fold
@@ -47,14 +64,33 @@ class PokerEnv(gym.Env):
             "legal_actions": spaces.Box(low=0, high=1, shape=(3,), dtype=np.int32),
         })
 
+        # Optional: win probability against the live opponents, from precomputed
+        # tables (path or EquityTables) where they cover the spot, else Monte Carlo
+        self.include_equity = include_equity
+        self.equity_estimator = None
+        if include_equity:
+            self.equity_estimator = equity_estimator or EquityEstimator(num_samples=200, tables=find_tables(equity_tables))
+            self.observation_space.spaces["equity"] = spaces.Box(low=0, high=1, shape=(1,), dtype=np.float32)
+
         self.initial_stack = 100.0 # Default in rlcard usually, need to check config
         
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
+        if self.backend == "batched":
+            if seed is not None:
+                self.engine.seed(seed)
+            self.engine.reset()
+            return self._get_engine_observation(), {}
+        if seed is not None:
+            # Seed rlcard's own RNG too, otherwise deals ignore the gym seed
+            self.game.seed(seed)
         self.state, self.player_id = self.game.reset()
         return self._get_observation(self.state), {}
 
     def step(self, action):
+        if self.backend == "batched":
+            return self._step_engine(action)
+
         # Map gym action to rlcard action
         # rlcard actions: fold, check, call, raise, all-in
         # We need to map our 0, 1, 2 to valid rlcard actions
@@ -81,6 +117,28 @@ class PokerEnv(gym.Env):
         
         return obs, reward, done, False, {}
 
+    def _step_engine(self, action):
+        engine = self.engine
+        engine.step(engine.map_actions([action]))
+        done = bool(engine.done[0])
+        reward = 0
+        if done:
+            # Same convention as the rlcard path: payoff of the seat the game points at
+            reward = engine.payoffs[0, engine.pointer[0]]
+        return self._get_engine_observation(), reward, done, False, {}
+
+    def _get_engine_observation(self):
+        obs = {key: value[0] for key, value in self.engine.observe().items()}
+        return self._add_equity(obs)
+
+    def _add_equity(self, obs):
+        if self.include_equity:
+            # Live players other than the one to act, from the 'active' column
+            opponents = int(obs["players"][:, 0].sum()) - 1
+            equity = self.equity_estimator.equity_batch(obs["hand"][None], obs["board"][None], [opponents])
+            obs["equity"] = equity.astype(np.float32)
+        return obs
+
     def _map_action(self, action, legal_actions):
         # 0: Fold
         # 1: Check/Call
@@ -145,7 +203,8 @@ class PokerEnv(gym.Env):
         # rlcard state['action_record'] accumulates.
         if 'action_record' in state:
             for pid, action in state['action_record']:
-                if action == 'fold':
+                # Entries hold rlcard Action enums, not strings
+                if getattr(action, 'name', action) in ('FOLD', 'fold'):
                     folded_players.add(pid)
         
         for i in range(self.num_players):
@@ -193,7 +252,7 @@ class PokerEnv(gym.Env):
         if 1 in legal_ids: legal_mask[1] = 1
         if 2 in legal_ids or 3 in legal_ids or 4 in legal_ids: legal_mask[2] = 1
         
-        return {
+        obs = {
             "hand": np.array(hand_cards, dtype=np.int32),
             "board": np.array(board_cards, dtype=np.int32),
             "pot": np.array([pot], dtype=np.float32),
@@ -204,6 +263,7 @@ class PokerEnv(gym.Env):
             "street": np.array([street], dtype=np.int32),
             "legal_actions": legal_mask
         }
+        return self._add_equity(obs)
 
     def _encode_card(self, card_str):
         # card_str: e.g. 'DT' (Diamond Ten)
@@ -1,39 +1,172 @@
 import gymnasium as gym
 from stable_baselines3 import PPO
 from stable_baselines3.common.env_checker import check_env
+from stable_baselines3.common.vec_env import SubprocVecEnv, DummyVecEnv
+from stable_baselines3.common.callbacks import BaseCallback, CheckpointCallback, CallbackList
+import argparse
+import glob
 import os
+import re
+import time
 from poker_env import PokerEnv
+from batched_vec_env import BatchedHoldemVecEnv
+
+CHECKPOINT_PREFIX = "ppo_poker"
+
+def make_env(rank, seed, num_players=6, include_equity=False, equity_tables=None):
+    """
+    Returns a factory for one rollout worker. Each worker gets its own seed
+    (seed + rank) so parallel envs don't deal identical hands.
+    """
+    def _init():
+        # Workers open the tables themselves; the memory map is shared through the page cache
+        env = PokerEnv(num_players=num_players, include_equity=include_equity, equity_tables=equity_tables)
+        env.reset(seed=seed + rank)
+        env.action_space.seed(seed + rank)
+        return env
+    return _init
+
+class StepsPerSecondCallback(BaseCallback):
+    """
+    Prints environment steps per second (summed over all workers) every
+    `report_interval` seconds and once more when training ends.
+    """
+    def __init__(self, report_interval=30.0, verbose=0):
+        super(StepsPerSecondCallback, self).__init__(verbose)
+        self.report_interval = report_interval
+
+    def _on_training_start(self):
+        self.start_time = time.time()
+        self.start_steps = self.num_timesteps
+        self.last_time = self.start_time
+        self.last_steps = self.num_timesteps
+
+    def _on_step(self):
+        now = time.time()
+        if now - self.last_time >= self.report_interval:
+            sps = (self.num_timesteps - self.last_steps) / (now - self.last_time)
+            self.logger.record("time/steps_per_second", sps)
+            print(f"[{self.num_timesteps} steps] {sps:.0f} steps/s")
+            self.last_time = now
+            self.last_steps = self.num_timesteps
+        return True
+
+    def _on_training_end(self):
+        elapsed = max(time.time() - self.start_time, 1e-9)
+        steps = self.num_timesteps - self.start_steps
+        print(f"Trained {steps} steps in {elapsed:.1f}s ({steps / elapsed:.0f} steps/s)")
+
+def find_latest_checkpoint(checkpoint_dir):
+    """
+    Returns the checkpoint with the highest step count in checkpoint_dir, or None.
+    """
+    pattern = os.path.join(checkpoint_dir, f"{CHECKPOINT_PREFIX}_*_steps.zip")
+    best_path, best_steps = None, -1
+    for path in glob.glob(pattern):
+        match = re.search(r"_(\d+)_steps\.zip$", path)
+        if match and int(match.group(1)) > best_steps:
+            best_path, best_steps = path, int(match.group(1))
+    return best_path
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train a PPO poker agent on parallel PokerEnv workers.")
+    parser.add_argument("--num-envs", type=int, default=os.cpu_count() or 1,
+                        help="Number of parallel environments (subprocess workers when > 1)")
+    parser.add_argument("--backend", choices=["rlcard", "batched"], default="rlcard",
+                        help="rlcard: one PokerEnv per worker; batched: all envs as NumPy tables in-process")
+    parser.add_argument("--equity", action="store_true",
+                        help="Add the equity feature to observations")
+    parser.add_argument("--equity-tables", default=None,
+                        help="Precomputed equity tables (tools/build_equity_tables.py) to use before Monte Carlo")
+    parser.add_argument("--timesteps", type=int, default=10000,
+                        help="Total environment steps to train for (across all workers)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Base seed; worker i is seeded with seed + i")
+    parser.add_argument("--n-steps", type=int, default=2048,
+                        help="Rollout length per environment before each PPO update")
+    parser.add_argument("--checkpoint-dir", default="checkpoints",
+                        help="Directory for periodic checkpoints")
+    parser.add_argument("--checkpoint-freq", type=int, default=100000,
+                        help="Save a checkpoint every N total steps (0 disables)")
+    parser.add_argument("--resume", nargs="?", const="latest", default=None,
+                        help="Resume from a checkpoint path, or the latest one in --checkpoint-dir")
+    parser.add_argument("--save-path", default="ppo_poker_agent",
+                        help="Where to save the final model")
+    parser.add_argument("--report-interval", type=float, default=30.0,
+                        help="Seconds between steps/sec reports")
+    parser.add_argument("--skip-check", action="store_true",
+                        help="Skip the gym interface check")
+    parser.add_argument("--eval-steps", type=int, default=20,
+                        help="Steps of greedy play to print after training")
+    return parser.parse_args()
 
 def main():
-    # Create environment
-    env = PokerEnv(num_players=6)
-    
+    args = parse_args()
+    num_envs = max(args.num_envs, 1)
+
     # Check if the environment follows Gym interface
-    print("Checking environment...")
-    check_env(env, warn=True)
-    print("Environment check passed!")
-    
-    # Initialize PPO agent
-    # We use MultiInputPolicy because observation is a Dict
-    model = PPO("MultiInputPolicy", env, verbose=1)
-    
-    # Train the agent
-    print("Training agent...")
-    model.learn(total_timesteps=10000)
-    
-    # Save the agent
-    save_path = "ppo_poker_agent"
-    model.save(save_path)
-    print(f"Model saved to {save_path}")
-    
+    if not args.skip_check:
+        print("Checking environment...")
+        check_env(PokerEnv(num_players=6, include_equity=args.equity, equity_tables=args.equity_tables), warn=True)
+        print("Environment check passed!")
+
+    # Create environments; rlcard is pure Python, so use one process per env
+    if args.backend == "batched":
+        env = BatchedHoldemVecEnv(num_envs, seed=args.seed, include_equity=args.equity,
+                                  equity_tables=args.equity_tables)
+    else:
+        env_fns = [make_env(i, args.seed, include_equity=args.equity, equity_tables=args.equity_tables)
+                   for i in range(num_envs)]
+        env = SubprocVecEnv(env_fns) if num_envs > 1 else DummyVecEnv(env_fns)
+    env.seed(args.seed)
+    print(f"Running {num_envs} environment(s) on the {args.backend} backend")
+
+    resume_path = args.resume
+    if resume_path == "latest":
+        resume_path = find_latest_checkpoint(args.checkpoint_dir)
+        if resume_path is None:
+            print(f"No checkpoint found in {args.checkpoint_dir}, starting fresh")
+
+    if resume_path:
+        print(f"Resuming from {resume_path}")
+        model = PPO.load(resume_path, env=env)
+    else:
+        # Initialize PPO agent
+        # We use MultiInputPolicy because observation is a Dict
+        model = PPO("MultiInputPolicy", env, n_steps=args.n_steps, seed=args.seed, verbose=1)
+
+    callbacks = [StepsPerSecondCallback(report_interval=args.report_interval)]
+    if args.checkpoint_freq > 0:
+        # CheckpointCallback counts vec env calls, each of which is num_envs steps
+        callbacks.append(CheckpointCallback(
+            save_freq=max(args.checkpoint_freq // num_envs, 1),
+            save_path=args.checkpoint_dir,
+            name_prefix=CHECKPOINT_PREFIX,
+        ))
+
+    # Train the agent; keep the step counter running when resuming, and
+    # only train the steps the checkpoint is still short of --timesteps
+    remaining = max(args.timesteps - model.num_timesteps, 0) if resume_path else args.timesteps
+    print(f"Training agent for {remaining} steps...")
+    try:
+        model.learn(total_timesteps=remaining,
+                    callback=CallbackList(callbacks),
+                    reset_num_timesteps=not resume_path)
+    finally:
+        # Save the agent
+        model.save(args.save_path)
+        print(f"Model saved to {args.save_path}")
+        env.close()
+
     # Test the agent
-    obs, _ = env.reset()
-    for _ in range(20):
+    test_env = PokerEnv(num_players=6, include_equity=args.equity, equity_tables=args.equity_tables)
+    obs, _ = test_env.reset(seed=args.seed)
+    for _ in range(args.eval_steps):
         action, _states = model.predict(obs, deterministic=True)
-        obs, reward, done, truncated, info = env.step(action)
+        obs, reward, done, truncated, info = test_env.step(action)
         print(f"Action: {action}, Reward: {reward}, Done: {done}")
         if done:
-            obs, _ = env.reset()
+            obs, _ = test_env.reset()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,81 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.rl.hand_eval import HandEvaluator, evaluate_best, CATEGORY_NAMES
+
+def random_hands(rng, count, size):
+    """
+    Draws `count` hands of `size` distinct cards.
+    """
+    return np.argsort(rng.random((count, 52)), axis=1)[:, :size].astype(np.int8)
+
+def check_against_rlcard(evaluator, rng, count):
+    """
+    Compares heads-up showdown winners with rlcard's compare_hands.
+    """
+    from rlcard.games.limitholdem.utils import compare_hands
+    suits = "SHDC"
+    ranks = "23456789TJQKA"
+    to_str = lambda c: suits[c % 4] + ranks[c // 4]
+
+    deals = random_hands(rng, count, 9)
+    hands = np.stack([deals[:, [0, 1, 4, 5, 6, 7, 8]], deals[:, [2, 3, 4, 5, 6, 7, 8]]], axis=1)
+    ours = evaluator.compare(hands)
+    mismatches = 0
+    for deal, winners in zip(hands, ours):
+        expected = compare_hands([[to_str(c) for c in hand] for hand in deal])
+        mismatches += list(winners.astype(int)) != expected
+    return mismatches
+
+def bench_hand_eval():
+    parser = argparse.ArgumentParser(description="Benchmark and check the lookup-table hand evaluator.")
+    parser.add_argument("--hands", type=int, default=2000000, help="Hands per timed batch")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed batches per hand size")
+    parser.add_argument("--check", type=int, default=100000, help="Hands to check against brute force")
+    parser.add_argument("--rlcard", type=int, default=0, help="Heads-up showdowns to check against rlcard")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    start = time.perf_counter()
+    evaluator = HandEvaluator()
+    print(f"Built tables in {time.perf_counter() - start:.2f} s")
+
+    for size in (5, 6, 7):
+        hands = random_hands(rng, args.check, size)
+        bad = np.count_nonzero(evaluator.class_values[evaluator.evaluate(hands)] != evaluate_best(hands))
+        print(f"{size} cards: {args.check - bad}/{args.check} agree with brute force")
+
+    # Single unbatched hands, flush and not, must match their batched value
+    singles = np.array([[0, 4, 8, 12, 16, 20, 25], [0, 1, 2, 3, 4, 5, 6], [48, 44, 40, 36, 32, 1, 2]])
+    agree = sum(int(evaluator.evaluate(hand)) == value
+                for hand, value in zip(singles, evaluator.evaluate(singles)))
+    print(f"Single hands: {agree}/{len(singles)} agree with batched")
+
+    for size in (5, 6, 7):
+        hands = random_hands(rng, args.hands, size)
+        evaluator.evaluate(hands[:1000])
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            evaluator.evaluate(hands)
+            best = min(best, time.perf_counter() - start)
+        print(f"{size} cards: {args.hands / best / 1e6:.2f} M hands/s")
+
+    # Category frequencies for 7-card hands, as a sanity check on the tables
+    classes = evaluator.evaluate(random_hands(rng, args.hands, 7))
+    counts = np.bincount(evaluator.category(classes), minlength=len(CATEGORY_NAMES))
+    for name, n in zip(CATEGORY_NAMES, counts):
+        print(f"  {name:<16} {100.0 * n / len(classes):6.3f}%")
+
+    if args.rlcard:
+        mismatches = check_against_rlcard(evaluator, rng, args.rlcard)
+        print(f"rlcard: {args.rlcard - mismatches}/{args.rlcard} showdowns agree")
+
+if __name__ == "__main__":
+    bench_hand_eval()
@@ -0,0 +1,65 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.rl.equity import EquityEstimator
+from src.rl.equity_tables import (DEFAULT_TABLES_PATH, canonical_flops, load_tables,
+                                  preflop_representatives, write_tables)
+
+def simulate(hands, boards, max_opponents, samples, batch, seed):
+    """
+    Equity of every row against 1..max_opponents opponents, (N, max_opponents).
+    """
+    estimator = EquityEstimator(num_samples=samples, cache_size=0, chunk_size=1 << 20, seed=seed)
+    out = np.zeros((len(hands), max_opponents), dtype=np.float32)
+    start = time.time()
+    for begin in range(0, len(hands), batch):
+        end = min(begin + batch, len(hands))
+        for opp in range(1, max_opponents + 1):
+            out[begin:end, opp - 1] = estimator.equity_batch(
+                hands[begin:end], boards[begin:end], np.full(end - begin, opp))
+        elapsed = time.time() - start
+        eta = elapsed / end * (len(hands) - end)
+        print(f"  {end}/{len(hands)} situations, {elapsed:.0f}s elapsed, ~{eta:.0f}s left", end="\r")
+    print()
+    return out
+
+def build_equity_tables():
+    parser = argparse.ArgumentParser(description="Precompute preflop and flop equity tables.")
+    parser.add_argument("--out", default=DEFAULT_TABLES_PATH, help="Output file")
+    parser.add_argument("--max-opponents", type=int, default=5)
+    parser.add_argument("--preflop-samples", type=int, default=200000, help="Samples per preflop class")
+    parser.add_argument("--flop-samples", type=int, default=500, help="Samples per (hand, flop) situation")
+    parser.add_argument("--no-flop", action="store_true", help="Only build the preflop table")
+    parser.add_argument("--batch", type=int, default=4096, help="Situations per simulation batch")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"Preflop: 169 classes x {args.max_opponents} opponent counts, {args.preflop_samples} samples")
+    hands = preflop_representatives()
+    boards = np.full((len(hands), 5), -1, dtype=np.int64)
+    preflop = simulate(hands, boards, args.max_opponents, args.preflop_samples, 13, args.seed)
+
+    flop_keys = np.zeros(0, dtype=np.int64)
+    flop = np.zeros((0, args.max_opponents), dtype=np.float32)
+    if not args.no_flop:
+        start = time.time()
+        flop_keys, hands, boards = canonical_flops()
+        print(f"Flop: {len(flop_keys)} canonical situations (enumerated in {time.time() - start:.1f}s), "
+              f"{args.flop_samples} samples")
+        flop = simulate(hands, boards, args.max_opponents, args.flop_samples, args.batch, args.seed + 1)
+
+    write_tables(args.out, preflop, flop_keys, flop, args.preflop_samples,
+                 0 if args.no_flop else args.flop_samples)
+    start = time.perf_counter()
+    tables = load_tables(args.out)
+    elapsed = (time.perf_counter() - start) * 1000
+    size = os.path.getsize(args.out) / 1e6
+    print(f"Wrote {args.out} ({size:.1f} MB, opens in {elapsed:.2f} ms, AA vs 1: {tables.preflop[12 * 13 + 12, 0]:.3f})")
+
+if __name__ == "__main__":
+    build_equity_tables()
@@ -39,8 +39,11 @@ def collect_templates():
     imCrop = img[int(r[1]):int(r[1]+r[3]), int(r[0]):int(r[0]+r[2])]
     
     # Save
-    name = input("Enter template name (e.g., Ah, dealer_btn): ")
-    category = input("Category (cards/state): ")
+    # Factorized cards only need 17 captures per skin:
+    # rank glyphs (A, K, ..., 2) in cards/ranks and suit pips (s, h, d, c) in cards/suits.
+    name = input("Enter template name (e.g., Ah, dealer_btn, A, h): ")
+    # Seat classifier samples go to seats/<status> (active, folded, empty, sitting_out, all_in)
+    category = input("Category (cards, state, cards/ranks, cards/suits, seats/<status>): ")
     
     save_dir = f"data/templates/{category}"
     if not os.path.exists(save_dir):
@@ -0,0 +1,44 @@
+import cv2
+import json
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.cv.capture import ScreenCapture
+from src.cv.cv_module import ComputerVision
+from src.cv.calibration import layout_from_absolute
+from src.integration.action_executor import ActionExecutor
+
+def make_layout():
+    """
+    Captures the screen with the table at its calibrated position, lets the
+    user select an anchor element, and writes the anchor template plus a
+    layout of the current regions/buttons relative to it.
+    """
+    print("Layout Tool")
+    cap = ScreenCapture()
+    print("Capturing in 3 seconds...")
+    cv2.waitKey(3000)
+    img = cap.capture_screen()
+
+    print("Select the anchor (e.g. table logo) and press SPACE or ENTER.")
+    r = cv2.selectROI("Select Anchor", img)
+    cv2.destroyWindow("Select Anchor")
+    if r[2] == 0 or r[3] == 0:
+        print("No region selected.")
+        return
+
+    x, y, w, h = (int(v) for v in r)
+    os.makedirs("data/templates", exist_ok=True)
+    os.makedirs("data/layouts", exist_ok=True)
+    cv2.imwrite("data/templates/anchor.png", img[y:y + h, x:x + w])
+
+    cv = ComputerVision()
+    layout = layout_from_absolute(cv.regions, ActionExecutor().buttons, (x, y))
+    with open("data/layouts/table.json", "w") as f:
+        json.dump(layout, f, indent=2)
+    print("Saved data/templates/anchor.png and data/layouts/table.json")
+
+if __name__ == "__main__":
+    make_layout()
@@ -0,0 +1,172 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+from rlcard.games.limitholdem import PlayerStatus
+from rlcard.games.limitholdem.utils import compare_hands
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.rl.poker_env import PokerEnv
+from src.rl.batched_holdem import BatchedHoldem
+
+def rlcard_deal(env):
+    """
+    Rebuilds the deal order of a freshly reset rlcard game as a deck for
+    BatchedHoldem: hole cards round-robin, then the board.
+    """
+    game = env.game.game
+    encode = lambda card: env._encode_card(card.get_index())
+    deck = [encode(p.hand[0]) for p in game.players]
+    deck += [encode(p.hand[1]) for p in game.players]
+    # rlcard deals by popping from the end of its deck
+    deck += [encode(c) for c in reversed(game.dealer.deck)]
+    return np.array(deck), game.dealer_id
+
+def split_winners(env):
+    game = env.game.game
+    hands = [[c.get_index() for c in p.hand + game.public_cards] if p.status != PlayerStatus.FOLDED else None
+             for p in game.players]
+    return compare_hands(hands)
+
+def compare_obs(expected, actual):
+    bad = []
+    for key, value in expected.items():
+        if not np.allclose(value, actual[key]):
+            bad.append(key)
+    return bad
+
+def verify_conformance(num_hands=500, seed=0):
+    """
+    Plays `num_hands` seeded rlcard hands and the same deals on one
+    BatchedHoldem with a table per hand, all tables stepped together.
+    Half the hands use PokerEnv actions, half raw rlcard actions so every
+    raise size is exercised. Observations, legal actions, rewards and
+    payoffs must agree at every step.
+    """
+    print(f"Verifying BatchedHoldem against rlcard on {num_hands} hands...")
+    rng = np.random.default_rng(seed)
+    envs, decks, dealers = [], [], []
+    for i in range(num_hands):
+        env = PokerEnv(num_players=6)
+        env.reset(seed=seed + i)
+        deck, dealer = rlcard_deal(env)
+        envs.append(env)
+        decks.append(deck)
+        dealers.append(dealer)
+
+    engine = BatchedHoldem(num_hands, num_players=6)
+    engine.reset(decks=np.array(decks), dealer_ids=np.array(dealers))
+    raw = np.arange(num_hands) % 2 == 1
+
+    failures = 0
+    odd_chip = 0
+    steps = 0
+    while not engine.done.all():
+        obs = engine.observe()
+        legal = engine.legal_actions()
+        rl_actions = np.zeros(num_hands, dtype=np.int64)
+        gym_actions = rng.integers(0, 3, num_hands)
+        for i in np.flatnonzero(~engine.done):
+            env = envs[i]
+            expected = env._get_observation(env.state)
+            bad = compare_obs(expected, {k: v[i] for k, v in obs.items()})
+            legal_ids = sorted(env.state['legal_actions'].keys())
+            if bad or legal_ids != list(np.flatnonzero(legal[i])):
+                print(f"  hand {i}: mismatch in {bad or ['legal_actions']} at step {steps}")
+                failures += 1
+                engine.done[i] = True
+                continue
+            if raw[i]:
+                rl_actions[i] = rng.choice(legal_ids)
+            else:
+                rl_actions[i] = env._map_action(gym_actions[i], env.state['legal_actions'])
+
+        engine.step(rl_actions)
+        steps += 1
+        for i in np.flatnonzero(engine.done):
+            env = envs[i]
+            if env.game.is_over():
+                continue
+            env.state, env.player_id = env.game.step(rl_actions[i])
+            if not env.game.is_over():
+                print(f"  hand {i}: engine finished but rlcard did not")
+                failures += 1
+                continue
+            expected = np.array(env.game.get_payoffs())
+            diff = np.abs(expected - engine.payoffs[i])
+            if diff.any():
+                # rlcard hands odd chips of a split pot to a random winner,
+                # so tied winners may differ by a few chips
+                winners = np.array(split_winners(env), dtype=bool)
+                if winners.sum() > 1 and not diff[~winners].any() and diff.max() < env.num_players:
+                    odd_chip += 1
+                else:
+                    print(f"  hand {i}: payoffs {expected} vs {engine.payoffs[i]}")
+                    failures += 1
+        for i in np.flatnonzero(~engine.done):
+            env = envs[i]
+            env.state, env.player_id = env.game.step(rl_actions[i])
+            if env.game.is_over():
+                print(f"  hand {i}: rlcard finished but engine did not")
+                failures += 1
+                engine.done[i] = True
+
+    print(f"{num_hands - failures}/{num_hands} hands agree ({odd_chip} split pots with an odd chip)")
+    if failures == 0:
+        print("SUCCESS: BatchedHoldem matches rlcard.")
+    else:
+        print("FAILURE: BatchedHoldem diverges from rlcard.")
+    return failures == 0
+
+def verify_env_backend(seed=0):
+    print("Verifying PokerEnv(backend='batched')...")
+    env = PokerEnv(num_players=6, backend="batched")
+    obs, _ = env.reset(seed=seed)
+    hands = 0
+    for _ in range(200):
+        # Shapes and dtypes only: the pot can exceed the space's upper bound
+        # of 1.0 on either backend once several players have called
+        for key, space in env.observation_space.spaces.items():
+            if obs[key].shape != space.shape or obs[key].dtype != space.dtype:
+                print(f"FAILURE: '{key}' is {obs[key].dtype}{obs[key].shape}, expected {space.dtype}{space.shape}")
+                return False
+        obs, reward, done, truncated, info = env.step(env.action_space.sample())
+        if done:
+            hands += 1
+            obs, _ = env.reset()
+    print(f"SUCCESS: {hands} hands played, observations valid.")
+    return True
+
+def benchmark(num_tables=4096, num_steps=200, seed=0):
+    engine = BatchedHoldem(num_tables, num_players=6, seed=seed)
+    engine.reset()
+    rng = np.random.default_rng(seed)
+    start = time.time()
+    for _ in range(num_steps):
+        engine.step(engine.map_actions(rng.integers(0, 3, num_tables)))
+        engine.observe()
+        engine.reset(engine.done)
+    elapsed = time.time() - start
+    print(f"BatchedHoldem: {num_tables * num_steps / elapsed:.0f} steps/s with {num_tables} tables")
+
+    env = PokerEnv(num_players=6)
+    env.reset(seed=seed)
+    start = time.time()
+    for _ in range(2000):
+        _, _, done, _, _ = env.step(env.action_space.sample())
+        if done:
+            env.reset()
+    print(f"rlcard PokerEnv: {2000 / (time.time() - start):.0f} steps/s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hands", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bench", action="store_true")
+    args = parser.parse_args()
+    verify_conformance(args.hands, args.seed)
+    verify_env_backend(args.seed)
+    if args.bench:
+        benchmark(seed=args.seed)
@@ -23,5 +23,24 @@ def verify_builder():
     print("Observation built successfully.")
     print(obs)
 
+def verify_misread_equity():
+    # A misread can repeat a card across hand and board; equity must be 0,
+    # not an exception or a number simulated from an impossible deck
+    builder = StateBuilder(initial_stack=100.0, include_equity=True, equity_tables=None)
+    seats = [{"id": i, "status": "active", "stack": 100.0, "bet": 0.0} for i in range(6)]
+    states = [
+        {"hand": ["Ah", "As"], "board": ["Ah", "2s", "3d"], "pot": 1.5, "players": seats},
+        {"hand": ["Ah", "Ah"], "board": [], "pot": 1.5, "players": seats},
+        {"hand": ["Ah", "As"], "board": ["Kd", "2s", "3d"], "pot": 1.5, "players": seats},
+    ]
+    single = [float(builder.build_observation(state)["equity"][0]) for state in states]
+    batch = builder.build_observations_batch(states)["equity"][:, 0].tolist()
+    print(f"Equity single: {single}, batch: {batch}")
+    if single[:2] == [0.0, 0.0] and batch[:2] == [0.0, 0.0] and single[2] > 0 and batch[2] > 0:
+        print("SUCCESS: Repeated cards give zero equity")
+    else:
+        print("FAILURE: Repeated cards were simulated")
+
 if __name__ == "__main__":
     verify_builder()
+    verify_misread_equity()
@@ -1,10 +1,14 @@
 import cv2
+import numpy as np
 import os
 import sys
+import tempfile
 
 # Add project root to path
 sys.path.append(os.getcwd())
-from src.cv.detection import CardDetector
+from src.cv.detection import CardDetector, StateDetector
+from src.cv.cv_module import ComputerVision
+from src.cv.recognition_cache import RecognitionCache
 
 def verify_detection():
     # 1. Load test capture
@@ -35,5 +39,105 @@ def verify_detection():
     else:
         print("FAILURE: Did not detect test_card")
 
+def synthetic_deck():
+    """52 grayscale 50x70 cards: rank glyphs in two corners and a suit shape."""
+    cards = {}
+    for rank in "23456789TJQKA":
+        for suit in "shdc":
+            img = np.full((70, 50), 235, dtype=np.uint8)
+            cv2.putText(img, rank, (4, 24), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 20, 2)
+            color = 20 if suit in "sc" else 90
+            if suit == "h":
+                cv2.circle(img, (14, 40), 6, color, -1)
+            elif suit == "d":
+                cv2.fillPoly(img, [np.array([(14, 34), (20, 40), (14, 46), (8, 40)])], color)
+            elif suit == "s":
+                cv2.fillPoly(img, [np.array([(14, 34), (20, 46), (8, 46)])], color)
+            else:
+                cv2.rectangle(img, (8, 34), (20, 46), color, -1)
+            cv2.putText(img, rank, (28, 62), cv2.FONT_HERSHEY_PLAIN, 1.0, 60, 1)
+            cards[rank + suit] = img
+    return cards
+
+def verify_pyramid_engine():
+    # The pyramid engine must read the same card as the batched engine on
+    # every card of a deck, placed with a small offset and noise
+    rng = np.random.default_rng(0)
+    deck = synthetic_deck()
+    with tempfile.TemporaryDirectory() as templates_dir:
+        for name, img in deck.items():
+            cv2.imwrite(os.path.join(templates_dir, name + ".png"), img)
+        batched = CardDetector(templates_dir=templates_dir, engine="batched")
+        pyramid = CardDetector(templates_dir=templates_dir, engine="pyramid")
+
+    agree = correct = 0
+    for name, img in deck.items():
+        region = np.full((76, 56), 200, dtype=np.uint8)
+        dx, dy = rng.integers(0, 6, 2)
+        region[dy:dy + 70, dx:dx + 50] = img
+        region = np.clip(region + rng.normal(0, 4, region.shape), 0, 255).astype(np.uint8)
+        expected = batched.match_card(region)
+        actual = pyramid.match_card(region)
+        agree += actual == expected
+        correct += actual == (name[0], name[1])
+
+    print(f"Pyramid engine: {agree}/{len(deck)} agree with batched, {correct}/{len(deck)} correct")
+    if agree == len(deck):
+        print("SUCCESS: Pyramid engine agrees with the batched engine")
+    else:
+        print("FAILURE: Pyramid engine disagrees with the batched engine")
+
+def verify_number_cache_keys():
+    # Distinct numbers on a wide stack/pot crop must never share a cache key,
+    # or a hit would return the wrong amount
+    cache = RecognitionCache()
+    keys = {}
+    for value in range(100, 2330):
+        img = np.full((75, 200), 30, dtype=np.uint8)
+        cv2.putText(img, str(value), (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.2, 230, 2)
+        keys.setdefault(cache.key(img, "number", exact=True), []).append(value)
+    collisions = sum(len(values) - 1 for values in keys.values())
+    print(f"Number keys: {collisions} collisions over {sum(map(len, keys.values()))} values")
+    if collisions == 0:
+        print("SUCCESS: Every number has its own cache key")
+    else:
+        print("FAILURE: Different numbers share a cache key")
+
+class StillCapture:
+    """Stands in for ScreenCapture: every region is cut from one BGR image."""
+    def __init__(self, image):
+        self.image = image
+
+    def capture_region(self, region, monitor_number=None):
+        t, l = region["top"], region["left"]
+        return self.image[t:t + region["height"], l:l + region["width"]].copy()
+
+def verify_turn_trigger():
+    # A turn template (no hero_turn.png) makes is_hero_turn fall back to
+    # template matching on the BGR crop grabbed by hero_to_act
+    rng = np.random.default_rng(0)
+    screen = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    buttons = rng.integers(0, 255, (12, 18, 3), dtype=np.uint8)
+    screen[894:906, 991:1009] = buttons
+
+    with tempfile.TemporaryDirectory() as templates_dir:
+        cv2.imwrite(os.path.join(templates_dir, "action_buttons.png"), cv2.cvtColor(buttons, cv2.COLOR_BGR2GRAY))
+        detector = StateDetector(templates_dir=templates_dir)
+        cv = ComputerVision(capture=StillCapture(screen), card_detector=CardDetector(templates_dir=templates_dir),
+                            state_detector=detector)
+        print(f"Turn trigger available: {detector.can_detect_turn}")
+        to_act = cv.hero_to_act()
+        cv.capture.image = np.zeros_like(screen)
+        waiting = cv.hero_to_act()
+
+    print(f"hero_to_act with buttons: {to_act}, without: {waiting}")
+    if to_act and not waiting:
+        print("SUCCESS: Turn trigger matches the action_buttons template")
+    else:
+        print("FAILURE: Turn trigger did not follow the action_buttons template")
+
 if __name__ == "__main__":
     verify_detection()
+    verify_turn_trigger()
+    verify_pyramid_engine()
+    verify_number_cache_keys()